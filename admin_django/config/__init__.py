@@ -0,0 +1,13 @@
+"""
+Pacote de configuração do projeto Student Monitor.
+"""
+# uvloop substitui o event loop padrão do asyncio (usado pelos consumers WebSocket)
+# por uma implementação em C. A policy precisa ser instalada antes de o Daphne criar
+# o loop do Twisted (import de daphne.server ao carregar INSTALLED_APPS), por isso
+# fica aqui e não em asgi.py. O uvloop não existe no Windows: lá segue o loop padrão.
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+else:
+    uvloop.install()
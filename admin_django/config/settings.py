@@ -71,10 +71,33 @@ WSGI_APPLICATION = 'config.wsgi.application'
 ASGI_APPLICATION = 'config.asgi.application'
 
 # Database
+# SQLite por padrão; em produção use PostgreSQL via DB_ENGINE=django.db.backends.postgresql
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': config('DB_ENGINE', default='django.db.backends.sqlite3'),
+        'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+        'USER': config('DB_USER', default=''),
+        'PASSWORD': config('DB_PASSWORD', default=''),
+        'HOST': config('DB_HOST', default=''),
+        'PORT': config('DB_PORT', default=''),
+        # Conexões persistentes apenas por opção (DB_CONN_MAX_AGE, em deploys WSGI):
+        # sob ASGI (Daphne) cada requisição roda o código síncrono em uma thread
+        # própria e as conexões não são reaproveitadas, podendo se acumular até o
+        # max_connections do banco. No ASGI, use um pooler (PgBouncer)
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=0, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+# Cache
+# Memória local por padrão. Com vários processos/servidores use um cache compartilhado
+# (ex.: CACHE_BACKEND=django.core.cache.backends.redis.RedisCache e
+# CACHE_LOCATION=redis://127.0.0.1:6379/1), para que a invalidação feita pelos
+# signals de Student valha para todos os processos
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
     }
 }
 
@@ -145,6 +168,12 @@ CHANNEL_LAYERS = {
     }
 }
 
+# Com um único processo ASGI, os frames de webcam são entregues direto aos viewers
+# do mesmo processo, sem passar pelo channel layer, e frames de webcam/tela de alunos
+# sem nenhum viewer conectado são descartados logo na chegada. Desative (False) ao
+# rodar vários processos/servidores com channel layer Redis.
+WEBCAM_LOCAL_FANOUT = config('WEBCAM_LOCAL_FANOUT', default=True, cast=bool)
+
 # Monitoring Settings
 ALLOWED_URLS = ['ava.anchieta.br']
 SUSPICIOUS_KEYWORDS = [
@@ -153,6 +182,11 @@ SUSPICIOUS_KEYWORDS = [
     'whatsapp', 'telegram', 'discord',
     'translate', 'tradutor', 'chatbot'
 ]
+SUSPICIOUS_APPS = [
+    'whatsapp', 'telegram', 'discord', 'slack', 'teams',
+    'notepad++', 'vscode', 'pycharm', 'visualstudio',
+    'cmd',
+]
 
 # Authentication Settings
 LOGIN_URL = '/accounts/login/'
@@ -6,6 +6,7 @@ import os
 import sys
 import django
 import getpass
+import textwrap
 
 # Configurar Django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
@@ -13,14 +14,20 @@ django.setup()
 
 from django.contrib.auth.models import User
 
+SEPARADOR = "=" * 60
+
 
 def criar_administrador():
     """Cria um usuário administrador."""
     
-    print("=" * 60)
-    print("  CRIAR USUÁRIO ADMINISTRADOR")
-    print("=" * 60)
-    print()
+    # Cada seção sai em uma única escrita no terminal
+    sys.stdout.write(textwrap.dedent(f"""\
+        {SEPARADOR}
+          CRIAR USUÁRIO ADMINISTRADOR
+        {SEPARADOR}
+
+    """))
+    sys.stdout.flush()
     
     # Solicitar username
     while True:
@@ -69,24 +76,29 @@ def criar_administrador():
             email=''  # Email opcional
         )
         
-        print()
-        print("=" * 60)
-        print("✅ ADMINISTRADOR CRIADO COM SUCESSO!")
-        print("=" * 60)
-        print()
-        print(f"  Username: {user.username}")
-        print(f"  É superusuário: Sim")
-        print(f"  É staff: Sim")
-        print()
-        print("Você já pode acessar o admin com essas credenciais:")
-        print("  http://localhost:8000/admin")
-        print()
+        sys.stdout.write(textwrap.dedent(f"""
+            {SEPARADOR}
+            ✅ ADMINISTRADOR CRIADO COM SUCESSO!
+            {SEPARADOR}
+
+              Username: {user.username}
+              É superusuário: Sim
+              É staff: Sim
+
+            Você já pode acessar o admin com essas credenciais:
+              http://localhost:8000/admin
+
+        """))
+        sys.stdout.flush()
         
     except Exception as e:
-        print()
-        print("❌ Erro ao criar administrador:")
-        print(f"  {str(e)}")
-        print()
+        # Formatado após o dedent: a mensagem do erro pode conter quebras de linha
+        sys.stdout.write(textwrap.dedent("""
+            ❌ Erro ao criar administrador:
+              {}
+
+        """).format(e))
+        sys.stdout.flush()
         sys.exit(1)
 
 
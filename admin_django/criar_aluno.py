@@ -1,5 +1,14 @@
-"""Script rápido para criar um aluno."""
+"""
+Script rápido para criar alunos.
+
+Uso:
+    python criar_aluno.py              # cria o aluno de teste (matrícula 123)
+    python criar_aluno.py alunos.csv   # cria em lote a partir de um CSV com
+                                       # cabeçalho: matricula,nome,email
+"""
+import csv
 import os
+import sys
 import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
@@ -7,24 +16,79 @@ django.setup()
 
 from students.models import Student
 
-# Criar aluno com matrícula 123
-student, created = Student.objects.get_or_create(
-    registration_number='123',
-    defaults={
-        'name': 'Aluno Teste',
-        'email': 'teste@aluno.br',
-        'is_active': True
-    }
-)
-
-if created:
-    print(f"[OK] Aluno criado com sucesso!")
-    print(f"  Matricula: {student.registration_number}")
-    print(f"  Nome: {student.name}")
-    print(f"  Email: {student.email}")
-    print(f"  API Key: {student.api_key}")
-else:
-    print(f"[OK] Aluno ja existe!")
-    print(f"  Matricula: {student.registration_number}")
-    print(f"  Nome: {student.name}")
+# Alunos por INSERT multi-linha
+BATCH_SIZE = 500
+
+# Aluno de teste padrão (matrícula 123)
+ALUNO_TESTE = ('123', 'Aluno Teste', 'teste@aluno.br')
+
+
+def carregar_csv(caminho):
+    """Lê (matrícula, nome, email) de um CSV com cabeçalho matricula,nome,email."""
+    with open(caminho, newline='', encoding='utf-8') as f:
+        return [
+            (row['matricula'].strip(), row['nome'].strip(), row['email'].strip())
+            for row in csv.DictReader(f)
+            if row.get('matricula')
+        ]
+
+
+def criar_alunos(rows):
+    """
+    Cria os alunos em lote, ignorando matrículas já cadastradas ou repetidas.
+
+    Retorna apenas os alunos de fato gravados: com ignore_conflicts o
+    bulk_create não informa quais linhas entraram, então elas são conferidas
+    pela api_key gerada em cada instância.
+    """
+    # Matrícula repetida no CSV: vale a primeira linha
+    unicos = {}
+    for registration_number, name, email in rows:
+        unicos.setdefault(registration_number, (name, email))
+    repetidas = len(rows) - len(unicos)
+
+    existentes = set(
+        Student.objects.filter(registration_number__in=list(unicos))
+        .values_list('registration_number', flat=True)
+    )
+
+    novos = [
+        Student(registration_number=registration_number, name=name, email=email, is_active=True)
+        for registration_number, (name, email) in unicos.items()
+        if registration_number not in existentes
+    ]
+    Student.objects.bulk_create(novos, ignore_conflicts=True, batch_size=BATCH_SIZE)
+
+    # Linhas descartadas por conflito (ex.: aluno criado em paralelo) não são informadas
+    gravadas = set(
+        Student.objects.filter(api_key__in=[student.api_key for student in novos])
+        .values_list('api_key', flat=True)
+    )
+    criados = [student for student in novos if student.api_key in gravadas]
+
+    return criados, existentes, repetidas
+
+
+def main():
+    rows = carregar_csv(sys.argv[1]) if len(sys.argv) > 1 else [ALUNO_TESTE]
+    criados, existentes, repetidas = criar_alunos(rows)
+
+    for student in criados:
+        print(f"[OK] Aluno criado com sucesso!")
+        print(f"  Matricula: {student.registration_number}")
+        print(f"  Nome: {student.name}")
+        print(f"  Email: {student.email}")
+        print(f"  API Key: {student.api_key}")
+
+    for registration_number in sorted(existentes):
+        print(f"[OK] Aluno ja existe!")
+        print(f"  Matricula: {registration_number}")
+
+    if repetidas:
+        print(f"\n[!] {repetidas} linha(s) com matricula repetida no CSV ignorada(s)")
+
+    print(f"\nTotal: {len(criados)} criado(s), {len(existentes)} ja existente(s)")
+
 
+if __name__ == '__main__':
+    main()
@@ -6,3 +6,5 @@ class DashboardConfig(AppConfig):
     name = 'dashboard'
     verbose_name = 'Dashboard'
 
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,35 @@
+"""
+Chaves de cache da dashboard, compartilhadas com os apps que as invalidam.
+"""
+from django.core.cache import cache
+from django.utils import timezone
+
+
+# Tempo (segundos) em que as estatísticas da dashboard são reaproveitadas entre requisições
+DASHBOARD_STATS_CACHE_TIMEOUT = 10
+# Intervalo mínimo (segundos) entre invalidações das estatísticas por novos alertas
+DASHBOARD_STATS_INVALIDATE_INTERVAL = 5
+DASHBOARD_STATS_INVALIDATED_KEY = 'dashboard:stats_invalidated'
+
+# Dados de alunos ativos compartilhados entre requisições: mudam bem menos do que
+# as telas são recarregadas (invalidados pelos signals de Student em dashboard/signals.py)
+STUDENT_FILTER_CACHE_KEY = 'dashboard:student_filter'
+ACTIVE_STUDENTS_COUNT_CACHE_KEY = 'dashboard:active_students_count'
+STUDENT_CACHE_TIMEOUT = 60
+
+
+def dashboard_stats_cache_key(day=None):
+    """Chave de cache das estatísticas da dashboard do dia informado (hoje, por padrão)."""
+    return f'dashboard:stats:{(day or timezone.localdate()).isoformat()}'
+
+
+def invalidate_dashboard_stats():
+    """
+    Descarta as estatísticas de hoje em cache (ex.: novos alertas foram criados).
+    
+    No máximo uma vez a cada DASHBOARD_STATS_INVALIDATE_INTERVAL segundos: com
+    alertas chegando sem parar, o cache continua sendo compartilhado entre as telas.
+    """
+    # cache.add só grava se a chave não existir: apenas a primeira chamada do intervalo invalida
+    if cache.add(DASHBOARD_STATS_INVALIDATED_KEY, True, DASHBOARD_STATS_INVALIDATE_INTERVAL):
+        cache.delete(dashboard_stats_cache_key())
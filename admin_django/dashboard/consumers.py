@@ -1,21 +1,161 @@
 """
 WebSocket consumers for real-time monitoring.
 """
-import json
+import asyncio
 import logging
+import struct
+import time
+from collections import defaultdict
+import orjson
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from django.utils import timezone
+from django.conf import settings
+from django.db import transaction
 from datetime import timedelta
 
 logger = logging.getLogger(__name__)
 
+# Cabeçalho dos frames binários de webcam (mesmo formato de student_script/api_client.py):
+# tamanho da matrícula, tamanho do nome, tamanho do JSON de detecções, tamanho do JPEG,
+# timestamp, número do frame, largura, altura, has_face, no_face_duration
+WEBCAM_FRAME_HEADER = struct.Struct('<IIIIdIHH?f')
+
+# Viewers de webcam conectados neste processo, por matrícula (usado quando
+# settings.WEBCAM_LOCAL_FANOUT está ativo, evitando o channel layer por frame)
+WEBCAM_VIEWERS = defaultdict(set)
+
+# Viewers de tela conectados neste processo, por matrícula (com WEBCAM_LOCAL_FANOUT,
+# frames de tela de alunos sem nenhum viewer são descartados sem decodificar)
+SCREEN_VIEWERS = defaultdict(set)
+
+# Os frames são repassados opacos aos viewers (só o cabeçalho é lido). Se algum
+# processamento de pixels for adicionado no servidor (decodificar, redimensionar...),
+# ele deve rodar fora do event loop, nunca diretamente nos consumers.
+
+
+# Alertas de face não detectada são gravados em lote por um único worker
+ALERT_BATCH_SIZE = 100
+ALERT_BATCH_WAIT = 0.5  # Segundos aguardando mais alertas antes de gravar o lote
+_alert_queue = None
+_alert_worker_task = None
+
+
+def _get_alert_queue():
+    """Retorna a fila de alertas, iniciando o worker no event loop atual se necessário."""
+    global _alert_queue, _alert_worker_task
+    if _alert_worker_task is None or _alert_worker_task.done():
+        _alert_queue = asyncio.Queue()
+        _alert_worker_task = asyncio.create_task(_alert_worker(_alert_queue))
+    return _alert_queue
+
+
+async def _alert_worker(queue):
+    """Agrupa os alertas enfileirados e grava cada lote com uma única ida ao banco."""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + ALERT_BATCH_WAIT
+        while len(batch) < ALERT_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        await _create_no_face_alerts(batch)
+
+
+@database_sync_to_async
+def _create_no_face_alerts(batch):
+    """Cria em lote os eventos e alertas de face não detectada no banco de dados."""
+    try:
+        from students.cache import get_student_by_registration
+        from monitoring.models import Alert, MonitoringEvent
+        from monitoring.notifications import notify_new_alerts
+        
+        # Ids dos alunos ativos do lote (cache de alunos por matrícula)
+        student_ids = {}
+        for registration_number in {registration_number for registration_number, _, _ in batch}:
+            student = get_student_by_registration(registration_number)
+            if student is not None and student.is_active:
+                student_ids[registration_number] = student.id
+        
+        events = []
+        alerts = []
+        for registration_number, student_name, duration in batch:
+            student_id = student_ids.get(registration_number)
+            if student_id is None:
+                logger.error(f"Aluno não encontrado: {registration_number}")
+                continue
+            
+            event = MonitoringEvent(
+                student_id=student_id,
+                event_type='system',
+                additional_data={
+                    'type': 'no_face_detected',
+                    'description': f"Face não detectada por {duration:.1f} segundos",
+                    'duration': duration,
+                    'student_name': student_name
+                }
+            )
+            events.append(event)
+            alerts.append(Alert(
+                event=event,
+                student_id=student_id,
+                severity='high',
+                title='Face não detectada',
+                description=f'O rosto do aluno {student_name} não foi detectado pela webcam por {duration:.1f} segundos.',
+                reason='A face do aluno deve estar sempre visível durante o monitoramento'
+            ))
+        
+        # Eventos + alertas do lote em uma única transação
+        with transaction.atomic():
+            MonitoringEvent.objects.bulk_create(events)
+            Alert.objects.bulk_create(alerts)
+            notify_new_alerts(alerts)
+        
+        logger.info(f"{len(alerts)} alerta(s) de face não detectada criado(s)")
+        
+    except Exception as e:
+        logger.error(f"Erro ao criar alertas de face não detectada: {e}", exc_info=True)
+
+
+@database_sync_to_async
+def _get_student(registration_number):
+    """Busca o aluno pela matrícula no cache de alunos (students/cache.py)."""
+    from students.cache import get_student_by_registration
+    return get_student_by_registration(registration_number)
+
+
+async def is_active_student(registration_number):
+    """Verifica se a matrícula pertence a um aluno ativo."""
+    student = await _get_student(registration_number)
+    return student is not None and student.is_active
+
+
+def _dumps(obj):
+    """Serializa um objeto para texto JSON usando orjson."""
+    return orjson.dumps(obj).decode('utf-8')
+
 
 class MonitoringConsumer(AsyncWebsocketConsumer):
     """Consumer para atualizações em tempo real de monitoramento."""
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Inicializado aqui para o disconnect não depender de hasattr
+        self.room_group_name = None
+    
     async def connect(self):
         """Conecta ao WebSocket."""
+        # Alertas trazem dados dos alunos: apenas usuários logados na dashboard
+        user = self.scope.get('user')
+        if not user or not user.is_authenticated:
+            logger.warning("Tentativa de conexão não autenticada ao monitoramento")
+            await self.close()
+            return
+        
         self.room_group_name = 'monitoring_updates'
         
         # Join room group
@@ -28,6 +168,10 @@ class MonitoringConsumer(AsyncWebsocketConsumer):
     
     async def disconnect(self, close_code):
         """Desconecta do WebSocket."""
+        # Conexões recusadas (não autenticadas) não entraram no grupo
+        if self.room_group_name is None:
+            return
+        
         # Leave room group
         await self.channel_layer.group_discard(
             self.room_group_name,
@@ -36,25 +180,25 @@ class MonitoringConsumer(AsyncWebsocketConsumer):
     
     async def receive(self, text_data):
         """Recebe mensagem do WebSocket."""
-        text_data_json = json.loads(text_data)
+        text_data_json = orjson.loads(text_data)
         message_type = text_data_json.get('type')
         
         # Processar diferentes tipos de mensagens se necessário
         if message_type == 'ping':
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=_dumps({
                 'type': 'pong'
             }))
     
     async def monitoring_event(self, event):
         """Envia evento de monitoramento para o WebSocket."""
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=_dumps({
             'type': 'monitoring_event',
             'data': event['data']
         }))
     
     async def monitoring_alert(self, event):
         """Envia alerta de monitoramento para o WebSocket."""
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=_dumps({
             'type': 'monitoring_alert',
             'data': event['data']
         }))
@@ -63,6 +207,13 @@ class MonitoringConsumer(AsyncWebsocketConsumer):
 class WebcamConsumer(AsyncWebsocketConsumer):
     """Consumer para receber streaming de webcam dos alunos."""
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Inicializados aqui para o disconnect não depender de hasattr
+        self.registration_number = None
+        self.room_group_name = None
+        self.writer_task = None
+    
     async def connect(self):
         """Conecta ao WebSocket da webcam de um aluno."""
         # Obter matrícula do aluno da URL
@@ -73,13 +224,25 @@ class WebcamConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
         
+        # Aceitar apenas alunos cadastrados e ativos (cache de alunos por matrícula)
+        if not await is_active_student(self.registration_number):
+            logger.warning(f"Conexão de webcam recusada: aluno {self.registration_number} não encontrado ou inativo")
+            await self.close()
+            return
+        
         # Nome do grupo para este aluno específico
         self.room_group_name = f'webcam_{self.registration_number}'
+        # Grupo dos viewers, calculado uma vez em vez de a cada frame
+        self.view_group_name = f'webcam_view_{self.registration_number}'
         
-        # Controle de alertas de face não detectada
+        # Controle de alertas de face não detectada (time.monotonic() do último alerta)
         self.last_no_face_alert = None
         self.alert_cooldown = 30  # Segundos entre alertas
         
+        # Fila de saída: o writer agrega os frames pendentes em um único group_send
+        self.out_queue = asyncio.Queue(maxsize=2)
+        self.writer_task = asyncio.create_task(self._writer())
+        
         # Join room group
         await self.channel_layer.group_add(
             self.room_group_name,
@@ -91,7 +254,10 @@ class WebcamConsumer(AsyncWebsocketConsumer):
     
     async def disconnect(self, close_code):
         """Desconecta do WebSocket."""
-        if hasattr(self, 'room_group_name'):
+        if self.writer_task:
+            self.writer_task.cancel()
+        
+        if self.room_group_name:
             # Leave room group
             await self.channel_layer.group_discard(
                 self.room_group_name,
@@ -100,120 +266,111 @@ class WebcamConsumer(AsyncWebsocketConsumer):
         
         logger.info(f"WebSocket desconectado para aluno {self.registration_number}")
     
-    async def receive(self, text_data):
+    async def receive(self, text_data=None, bytes_data=None):
         """
         Recebe frames da webcam do aluno.
         
-        Formato esperado:
-        {
-            'type': 'webcam_frame',
-            'registration_number': '...',
-            'student_name': '...',
-            'machine_name': '...',
-            'data': {
-                'frame': 'base64_encoded_image',
-                'detections': [...],
-                'timestamp': ...,
-                'frame_number': ...,
-                'width': ...,
-                'height': ...,
-                'has_face': bool,
-                'no_face_duration': float
-            }
-        }
+        Os frames chegam como mensagens binárias no formato:
+        
+            WEBCAM_FRAME_HEADER | matrícula | nome do aluno | detecções (JSON) | JPEG
+        
+        O cabeçalho traz os tamanhos das seções variáveis e os campos usados
+        no servidor (has_face, no_face_duration), de forma que o payload é
+        repassado aos viewers sem decodificar JSON nem base64.
         """
+        if bytes_data is None:
+            logger.warning(f"Mensagem de texto ignorada no WebSocket de webcam do aluno {self.registration_number}")
+            return
+        
         try:
-            message = json.loads(text_data)
-            message_type = message.get('type')
+            (reg_len, name_len, detections_len, image_len,
+             _timestamp, _frame_number, _width, _height,
+             has_face, no_face_duration) = WEBCAM_FRAME_HEADER.unpack_from(bytes_data)
             
-            if message_type == 'webcam_frame':
-                # Broadcast para todos os viewers conectados ao grupo deste aluno
-                await self.channel_layer.group_send(
-                    f'webcam_view_{self.registration_number}',
-                    {
-                        'type': 'webcam_frame_broadcast',
-                        'message': message
-                    }
-                )
-                
-                frame_data = message.get('data', {})
-                detections = frame_data.get('detections', [])
-                has_face = frame_data.get('has_face', False)
-                no_face_duration = frame_data.get('no_face_duration', 0)
+            if WEBCAM_FRAME_HEADER.size + reg_len + name_len + detections_len + image_len != len(bytes_data):
+                logger.error(f"Frame de webcam com tamanho inválido do aluno {self.registration_number}")
+                return
+            
+            # Sem viewers conectados não há o que transmitir; só verificar o alerta abaixo
+            if not settings.WEBCAM_LOCAL_FANOUT or WEBCAM_VIEWERS.get(self.registration_number):
+                # Enfileirar para broadcast; se a fila estiver cheia, descartar o frame mais antigo
+                try:
+                    self.out_queue.put_nowait(bytes_data)
+                except asyncio.QueueFull:
+                    self.out_queue.get_nowait()
+                    self.out_queue.put_nowait(bytes_data)
+            
+            # Verificar se há face detectada
+            # SIMPLES: Se não detectou nada por 2+ segundos = alerta
+            if not has_face and no_face_duration >= 2.0:
+                # Criar alerta se passou o cooldown (relógio monotônico, em segundos)
+                now = time.monotonic()
                 
-                # Verificar se há face detectada
-                # SIMPLES: Se não detectou nada por 2+ segundos = alerta
-                if not has_face and no_face_duration >= 2.0:
-                    # Criar alerta se passou o cooldown
-                    now = timezone.now()
-                    should_alert = True
+                if self.last_no_face_alert is None or now - self.last_no_face_alert >= self.alert_cooldown:
+                    offset = WEBCAM_FRAME_HEADER.size
+                    registration_number = bytes_data[offset:offset + reg_len].decode('utf-8')
+                    offset += reg_len
+                    student_name = bytes_data[offset:offset + name_len].decode('utf-8') or 'Desconhecido'
                     
-                    if self.last_no_face_alert:
-                        elapsed = (now - self.last_no_face_alert).total_seconds()
-                        if elapsed < self.alert_cooldown:
-                            should_alert = False
-                    
-                    if should_alert:
-                        await self._create_no_face_alert(
-                            message.get('registration_number'),
-                            message.get('student_name', 'Desconhecido'),
-                            no_face_duration
-                        )
-                        self.last_no_face_alert = now
-                        logger.warning(
-                            f"ALERTA: Face não detectada para aluno {self.registration_number} "
-                            f"por {no_face_duration:.1f} segundos"
-                        )
+                    await self._create_no_face_alert(
+                        registration_number,
+                        student_name,
+                        no_face_duration
+                    )
+                    self.last_no_face_alert = now
+                    logger.warning(
+                        f"ALERTA: Face não detectada para aluno {self.registration_number} "
+                        f"por {no_face_duration:.1f} segundos"
+                    )
             
-        except json.JSONDecodeError as e:
-            logger.error(f"Erro ao decodificar JSON: {e}")
+        except struct.error as e:
+            logger.error(f"Erro ao decodificar frame de webcam: {e}")
         except Exception as e:
             logger.error(f"Erro ao processar mensagem da webcam: {e}", exc_info=True)
     
-    @database_sync_to_async
-    def _create_no_face_alert(self, registration_number, student_name, duration):
-        """Cria alerta de face não detectada no banco de dados."""
-        try:
-            from students.models import Student
-            from monitoring.models import Alert, MonitoringEvent
-            
-            # Buscar aluno
-            student = Student.objects.filter(registration_number=registration_number).first()
-            if not student:
-                logger.error(f"Aluno não encontrado: {registration_number}")
-                return
-            
-            # Criar evento de monitoramento
-            event = MonitoringEvent.objects.create(
-                student=student,
-                event_type='other',
-                description=f"Face não detectada por {duration:.1f} segundos",
-                additional_data={
-                    'type': 'no_face_detected',
-                    'duration': duration,
-                    'student_name': student_name
-                }
-            )
-            
-            # Criar alerta
-            Alert.objects.create(
-                event=event,
-                student=student,
-                severity='high',
-                title='Face não detectada',
-                description=f'O rosto do aluno {student_name} não foi detectado pela webcam por {duration:.1f} segundos.',
-                reason='A face do aluno deve estar sempre visível durante o monitoramento'
-            )
-            
-            logger.info(f"Alerta de face não detectada criado para {student_name}")
+    async def _writer(self):
+        """
+        Envia os frames enfileirados para os viewers.
+        
+        Drena todos os frames pendentes e envia apenas o mais recente
+        (frames antigos de vídeo já estão obsoletos), fazendo um único
+        group_send por ciclo.
+        """
+        while True:
+            payload = await self.out_queue.get()
+            while not self.out_queue.empty():
+                payload = self.out_queue.get_nowait()
             
-        except Exception as e:
-            logger.error(f"Erro ao criar alerta de face não detectada: {e}", exc_info=True)
+            try:
+                if settings.WEBCAM_LOCAL_FANOUT:
+                    # Entrega direta aos viewers deste processo (mesmo payload para todos)
+                    for viewer in tuple(WEBCAM_VIEWERS.get(self.registration_number, ())):
+                        viewer.enqueue_frame(payload)
+                else:
+                    await self.channel_layer.group_send(
+                        self.view_group_name,
+                        {
+                            'type': 'webcam_frame_broadcast',
+                            'payload': payload
+                        }
+                    )
+            except Exception as e:
+                logger.error(f"Erro ao transmitir frame da webcam: {e}")
+    
+    async def _create_no_face_alert(self, registration_number, student_name, duration):
+        """Enfileira alerta de face não detectada para gravação em lote pelo worker."""
+        _get_alert_queue().put_nowait((registration_number, student_name, duration))
 
 
 class WebcamViewerConsumer(AsyncWebsocketConsumer):
     """Consumer para viewers (admin) assistirem streams de webcam."""
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.registration_number = None
+        self.room_group_name = None
+        self.writer_task = None
+    
     async def connect(self):
         """Conecta ao WebSocket para visualizar webcam de um aluno."""
         # Obter matrícula do aluno da URL
@@ -231,21 +388,38 @@ class WebcamViewerConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
         
-        # Nome do grupo para visualizadores deste aluno
-        self.room_group_name = f'webcam_view_{self.registration_number}'
+        # Fila de 1 frame por viewer: um viewer lento só perde frames, sem atrasar os demais
+        self.frame_queue = asyncio.Queue(maxsize=1)
+        self.writer_task = asyncio.create_task(self._writer())
         
-        # Join room group
-        await self.channel_layer.group_add(
-            self.room_group_name,
-            self.channel_name
-        )
+        if settings.WEBCAM_LOCAL_FANOUT:
+            # Registrar no mapa local; o WebcamConsumer do aluno entrega os frames direto
+            WEBCAM_VIEWERS[self.registration_number].add(self)
+        else:
+            # Nome do grupo para visualizadores deste aluno
+            self.room_group_name = f'webcam_view_{self.registration_number}'
+            
+            # Join room group
+            await self.channel_layer.group_add(
+                self.room_group_name,
+                self.channel_name
+            )
         
         await self.accept()
         logger.info(f"Viewer conectado para aluno {self.registration_number}")
     
     async def disconnect(self, close_code):
         """Desconecta do WebSocket."""
-        if hasattr(self, 'room_group_name'):
+        viewers = WEBCAM_VIEWERS.get(self.registration_number)
+        if viewers is not None:
+            viewers.discard(self)
+            if not viewers:
+                WEBCAM_VIEWERS.pop(self.registration_number, None)
+        
+        if self.writer_task:
+            self.writer_task.cancel()
+        
+        if self.room_group_name:
             # Leave room group
             await self.channel_layer.group_discard(
                 self.room_group_name,
@@ -254,18 +428,36 @@ class WebcamViewerConsumer(AsyncWebsocketConsumer):
         
         logger.info(f"Viewer desconectado para aluno {self.registration_number}")
     
-    async def webcam_frame_broadcast(self, event):
-        """Envia frame da webcam para o viewer."""
+    def enqueue_frame(self, payload):
+        """Enfileira um frame (binário, já empacotado pelo aluno), mantendo só o mais recente."""
         try:
-            message = event['message']
-            await self.send(text_data=json.dumps(message))
-        except Exception as e:
-            logger.error(f"Erro ao enviar frame para viewer: {e}")
+            self.frame_queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.frame_queue.get_nowait()
+            self.frame_queue.put_nowait(payload)
+    
+    async def webcam_frame_broadcast(self, event):
+        """Recebe frame da webcam pelo channel layer."""
+        self.enqueue_frame(event['payload'])
+    
+    async def _writer(self):
+        """Envia ao viewer o frame mais recente da fila."""
+        while True:
+            payload = await self.frame_queue.get()
+            try:
+                await self.send(bytes_data=payload)
+            except Exception as e:
+                logger.error(f"Erro ao enviar frame para viewer: {e}")
 
 
 class ScreenConsumer(AsyncWebsocketConsumer):
     """Consumer para receber streaming de tela dos alunos."""
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.registration_number = None
+        self.room_group_name = None
+    
     async def connect(self):
         """Conecta ao WebSocket da tela de um aluno."""
         # Obter matrícula do aluno da URL
@@ -276,8 +468,15 @@ class ScreenConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
         
+        # Aceitar apenas alunos cadastrados e ativos (cache de alunos por matrícula)
+        if not await is_active_student(self.registration_number):
+            logger.warning(f"Conexão de tela recusada: aluno {self.registration_number} não encontrado ou inativo")
+            await self.close()
+            return
+        
         # Nome do grupo para este aluno específico
         self.room_group_name = f'screen_{self.registration_number}'
+        self.view_group_name = f'screen_view_{self.registration_number}'
         
         # Join room group
         await self.channel_layer.group_add(
@@ -290,7 +489,7 @@ class ScreenConsumer(AsyncWebsocketConsumer):
     
     async def disconnect(self, close_code):
         """Desconecta do WebSocket."""
-        if hasattr(self, 'room_group_name'):
+        if self.room_group_name:
             # Leave room group
             await self.channel_layer.group_discard(
                 self.room_group_name,
@@ -318,21 +517,26 @@ class ScreenConsumer(AsyncWebsocketConsumer):
             }
         }
         """
+        # Nenhum viewer de tela neste processo: descartar sem decodificar o frame
+        if settings.WEBCAM_LOCAL_FANOUT and not SCREEN_VIEWERS.get(self.registration_number):
+            return
+        
         try:
-            message = json.loads(text_data)
+            message = orjson.loads(text_data)
             message_type = message.get('type')
             
             if message_type == 'screen_frame':
                 # Broadcast para todos os viewers conectados ao grupo deste aluno
+                # (o texto JSON original é repassado como está, serializado uma única vez)
                 await self.channel_layer.group_send(
-                    f'screen_view_{self.registration_number}',
+                    self.view_group_name,
                     {
                         'type': 'screen_frame_broadcast',
-                        'message': message
+                        'payload': text_data
                     }
                 )
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Erro ao decodificar JSON de tela: {e}")
         except Exception as e:
             logger.error(f"Erro ao processar mensagem de tela: {e}", exc_info=True)
@@ -341,6 +545,11 @@ class ScreenConsumer(AsyncWebsocketConsumer):
 class ScreenViewerConsumer(AsyncWebsocketConsumer):
     """Consumer para viewers (admin) assistirem streams de tela."""
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.registration_number = None
+        self.room_group_name = None
+    
     async def connect(self):
         """Conecta ao WebSocket para visualizar tela de um aluno."""
         # Obter matrícula do aluno da URL
@@ -366,13 +575,20 @@ class ScreenViewerConsumer(AsyncWebsocketConsumer):
             self.room_group_name,
             self.channel_name
         )
+        SCREEN_VIEWERS[self.registration_number].add(self)
         
         await self.accept()
         logger.info(f"Viewer de tela conectado para aluno {self.registration_number}")
     
     async def disconnect(self, close_code):
         """Desconecta do WebSocket."""
-        if hasattr(self, 'room_group_name'):
+        viewers = SCREEN_VIEWERS.get(self.registration_number)
+        if viewers is not None:
+            viewers.discard(self)
+            if not viewers:
+                SCREEN_VIEWERS.pop(self.registration_number, None)
+        
+        if self.room_group_name:
             # Leave room group
             await self.channel_layer.group_discard(
                 self.room_group_name,
@@ -382,10 +598,9 @@ class ScreenViewerConsumer(AsyncWebsocketConsumer):
         logger.info(f"Viewer de tela desconectado para aluno {self.registration_number}")
     
     async def screen_frame_broadcast(self, event):
-        """Envia frame da tela para o viewer."""
+        """Envia frame da tela (JSON já serializado pelo aluno) para o viewer."""
         try:
-            message = event['message']
-            await self.send(text_data=json.dumps(message))
+            await self.send(text_data=event['payload'])
         except Exception as e:
             logger.error(f"Erro ao enviar frame de tela para viewer: {e}")
 
@@ -393,6 +608,11 @@ class ScreenViewerConsumer(AsyncWebsocketConsumer):
 class BrowserConsumer(AsyncWebsocketConsumer):
     """Consumer para receber dados de navegação dos alunos em tempo real."""
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.registration_number = None
+        self.room_group_name = None
+    
     async def connect(self):
         """Conecta ao WebSocket de browser do aluno."""
         # Obter matrícula do aluno da URL
@@ -403,8 +623,15 @@ class BrowserConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
         
+        # Aceitar apenas alunos cadastrados e ativos (cache de alunos por matrícula)
+        if not await is_active_student(self.registration_number):
+            logger.warning(f"Conexão de browser recusada: aluno {self.registration_number} não encontrado ou inativo")
+            await self.close()
+            return
+        
         # Nome do grupo para este aluno específico
         self.room_group_name = f'browser_{self.registration_number}'
+        self.view_group_name = f'browser_view_{self.registration_number}'
         
         # Join room group
         await self.channel_layer.group_add(
@@ -417,7 +644,7 @@ class BrowserConsumer(AsyncWebsocketConsumer):
     
     async def disconnect(self, close_code):
         """Desconecta do WebSocket."""
-        if hasattr(self, 'room_group_name'):
+        if self.room_group_name:
             # Leave room group
             await self.channel_layer.group_discard(
                 self.room_group_name,
@@ -444,20 +671,21 @@ class BrowserConsumer(AsyncWebsocketConsumer):
         }
         """
         try:
-            message = json.loads(text_data)
+            message = orjson.loads(text_data)
             message_type = message.get('type')
             
             if message_type == 'browser_data':
                 # Broadcast para todos os viewers conectados
+                # (o texto JSON original é repassado como está, serializado uma única vez)
                 await self.channel_layer.group_send(
-                    f'browser_view_{self.registration_number}',
+                    self.view_group_name,
                     {
                         'type': 'browser_data_broadcast',
-                        'message': message
+                        'payload': text_data
                     }
                 )
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Erro ao decodificar JSON de browser: {e}")
         except Exception as e:
             logger.error(f"Erro ao processar mensagem de browser: {e}", exc_info=True)
@@ -466,6 +694,11 @@ class BrowserConsumer(AsyncWebsocketConsumer):
 class BrowserViewerConsumer(AsyncWebsocketConsumer):
     """Consumer para viewers (admin) verem dados de navegação."""
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.registration_number = None
+        self.room_group_name = None
+    
     async def connect(self):
         """Conecta ao WebSocket para visualizar browser de um aluno."""
         self.registration_number = self.scope['url_route']['kwargs'].get('registration_number')
@@ -489,7 +722,7 @@ class BrowserViewerConsumer(AsyncWebsocketConsumer):
         await self.accept()
     
     async def disconnect(self, close_code):
-        if hasattr(self, 'room_group_name'):
+        if self.room_group_name:
             await self.channel_layer.group_discard(
                 self.room_group_name,
                 self.channel_name
@@ -497,7 +730,6 @@ class BrowserViewerConsumer(AsyncWebsocketConsumer):
     
     async def browser_data_broadcast(self, event):
         try:
-            message = event['message']
-            await self.send(text_data=json.dumps(message))
+            await self.send(text_data=event['payload'])
         except Exception as e:
             logger.error(f"Erro ao enviar dados de browser para viewer: {e}")
@@ -0,0 +1,17 @@
+"""
+Signals do dashboard.
+"""
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from students.models import Student
+
+from .cache import ACTIVE_STUDENTS_COUNT_CACHE_KEY, STUDENT_FILTER_CACHE_KEY
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_student_lists(sender, instance, **kwargs):
+    """Mantém os caches de alunos da dashboard (filtros e contagem de ativos) em dia."""
+    cache.delete_many([STUDENT_FILTER_CACHE_KEY, ACTIVE_STUDENTS_COUNT_CACHE_KEY])
@@ -8,6 +8,9 @@ app_name = 'dashboard'
 
 urlpatterns = [
     path('', views.dashboard_home, name='home'),
+    path('stats/', views.dashboard_stats, name='stats'),
+    path('alerts/recent/', views.dashboard_recent_alerts, name='recent_alerts'),
+    path('events/recent/', views.dashboard_recent_events, name='recent_events'),
     path('student/<uuid:student_id>/', views.student_detail, name='student_detail'),
     path('alerts/', views.alerts_list, name='alerts_list'),
     path('events/', views.events_list, name='events_list'),
@@ -3,6 +3,10 @@ Views for Dashboard.
 """
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django.db.models import Count, Q
 from django.utils import timezone
 from datetime import timedelta
@@ -10,73 +14,100 @@ from datetime import timedelta
 from monitoring.models import MonitoringEvent, Alert
 from students.models import Student, ExamSession
 
+from .cache import (
+    ACTIVE_STUDENTS_COUNT_CACHE_KEY, DASHBOARD_STATS_CACHE_TIMEOUT, STUDENT_CACHE_TIMEOUT,
+    STUDENT_FILTER_CACHE_KEY, dashboard_stats_cache_key,
+)
+
+
+def get_dashboard_stats():
+    """
+    Retorna as estatísticas gerais da dashboard.
+    
+    O resultado fica em cache por alguns segundos, para que várias telas
+    fazendo polling compartilhem as mesmas consultas.
+    """
+    today = timezone.localdate()
+    cache_key = dashboard_stats_cache_key(today)
+    stats = cache.get(cache_key)
+    if stats is not None:
+        return stats
+    
+    total_students = get_active_students_count()
+    total_events_today = MonitoringEvent.objects.filter(
+        timestamp__date=today
+    ).count()
+    
+    # Alertas ativos e críticos em uma única consulta
+    alert_counts = Alert.objects.filter(status__in=['new', 'reviewing']).aggregate(
+        total=Count('id'),
+        critical=Count('id', filter=Q(severity='critical'))
+    )
+    
+    stats = {
+        'total_students': total_students,
+        'total_events_today': total_events_today,
+        'active_alerts': alert_counts['total'],
+        'critical_alerts': alert_counts['critical'],
+    }
+    cache.set(cache_key, stats, timeout=DASHBOARD_STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def get_student_filter_choices():
+    """Retorna id e nome dos alunos ativos para os filtros por aluno."""
+    return cache.get_or_set(
+        STUDENT_FILTER_CACHE_KEY,
+        lambda: list(Student.objects.filter(is_active=True).order_by('name').values('id', 'name')),
+        STUDENT_CACHE_TIMEOUT
+    )
+
+
+def get_active_students_count():
+    """Retorna a quantidade de alunos ativos."""
+    return cache.get_or_set(
+        ACTIVE_STUDENTS_COUNT_CACHE_KEY,
+        lambda: Student.objects.filter(is_active=True).count(),
+        STUDENT_CACHE_TIMEOUT
+    )
+
 
 @login_required
 def dashboard_home(request):
     """View principal da dashboard."""
-    from django.http import JsonResponse
-    
-    # Verificar se é requisição AJAX
-    ajax_type = request.GET.get('ajax')
     
     # Estatísticas gerais
-    total_students = Student.objects.filter(is_active=True).count()
-    total_events_today = MonitoringEvent.objects.filter(
-        timestamp__date=timezone.now().date()
-    ).count()
+    stats = get_dashboard_stats()
     
-    active_alerts = Alert.objects.filter(status__in=['new', 'reviewing']).count()
-    critical_alerts = Alert.objects.filter(
-        status__in=['new', 'reviewing'],
-        severity='critical'
-    ).count()
+    # Alertas e eventos recentes não entram aqui: a página chega com placeholders
+    # e busca cada tabela em dashboard_recent_alerts/dashboard_recent_events
     
-    # Se é requisição AJAX para estatísticas
-    if ajax_type == 'stats':
-        return JsonResponse({
-            'total_students': total_students,
-            'total_events_today': total_events_today,
-            'active_alerts': active_alerts,
-            'critical_alerts': critical_alerts,
-        })
-    
-    # Alertas recentes
-    recent_alerts = Alert.objects.select_related(
-        'student', 'event'
-    ).filter(
+    # Alunos com mais alertas: agrupar apenas os alertas ativos e só então
+    # buscar os 10 alunos do topo, em vez de agrupar todos os alunos
+    top_alert_counts = Alert.objects.filter(
         status__in=['new', 'reviewing']
-    ).order_by('-created_at')[:10]
-    
-    # Eventos recentes
-    recent_events = MonitoringEvent.objects.select_related(
-        'student', 'exam_session'
-    ).order_by('-timestamp')[:20]
-    
-    # Se é requisição AJAX para alertas ou eventos
-    if ajax_type in ['alertas', 'eventos']:
-        context = {
-            'recent_alerts': recent_alerts if ajax_type == 'alertas' else [],
-            'recent_events': recent_events if ajax_type == 'eventos' else [],
-        }
-        return render(request, 'dashboard/home.html', context)
-    
-    # Alunos com mais alertas
-    students_with_alerts = Student.objects.annotate(
-        alert_count=Count('alerts', filter=Q(alerts__status__in=['new', 'reviewing']))
-    ).filter(alert_count__gt=0).order_by('-alert_count')[:10]
-    
-    # Sessões de exame ativas
+    ).values('student_id').annotate(
+        alert_count=Count('id')
+    ).order_by('-alert_count')[:10]
+    top_alert_counts = list(top_alert_counts)
+    students_by_id = Student.objects.only(
+        'id', 'name', 'registration_number'
+    ).in_bulk([row['student_id'] for row in top_alert_counts])
+    
+    students_with_alerts = []
+    for row in top_alert_counts:
+        student = students_by_id.get(row['student_id'])
+        if student is not None:
+            student.alert_count = row['alert_count']
+            students_with_alerts.append(student)
+    
+    # Sessões de exame ativas (o template só exibe a quantidade de alunos)
     active_exams = ExamSession.objects.filter(
         status='active'
-    ).prefetch_related('students')
+    ).annotate(student_count=Count('students'))
     
     context = {
-        'total_students': total_students,
-        'total_events_today': total_events_today,
-        'active_alerts': active_alerts,
-        'critical_alerts': critical_alerts,
-        'recent_alerts': recent_alerts,
-        'recent_events': recent_events,
+        **stats,
         'students_with_alerts': students_with_alerts,
         'active_exams': active_exams,
     }
@@ -84,20 +115,74 @@ def dashboard_home(request):
     return render(request, 'dashboard/home.html', context)
 
 
+@login_required
+def dashboard_recent_alerts(request):
+    """Linhas da tabela de alertas recentes da página inicial (atualização periódica)."""
+    
+    # Apenas as colunas exibidas no template
+    recent_alerts = Alert.objects.select_related(
+        'student'
+    ).only(
+        'id', 'title', 'description', 'severity', 'created_at', 'student__name'
+    ).filter(
+        status__in=['new', 'reviewing']
+    ).order_by('-created_at')[:10]
+    
+    return render(request, 'dashboard/partials/recent_alerts.html', {'recent_alerts': recent_alerts})
+
+
+@login_required
+def dashboard_recent_events(request):
+    """Linhas da tabela de eventos recentes da página inicial (atualização periódica)."""
+    
+    # O template não exibe a sessão de exame: apenas o JOIN com o aluno
+    recent_events = MonitoringEvent.objects.select_related(
+        'student'
+    ).only(
+        'id', 'timestamp', 'event_type', 'url', 'app_name', 'key_event',
+        'window_title', 'additional_data', 'student__name'
+    ).order_by('-timestamp')[:20]
+    
+    return render(request, 'dashboard/partials/recent_events.html', {'recent_events': recent_events})
+
+
+def _dashboard_stats_etag(request):
+    """ETag das estatísticas: muda apenas quando algum dos números muda."""
+    return '{total_students}-{total_events_today}-{active_alerts}-{critical_alerts}'.format(
+        **get_dashboard_stats()
+    )
+
+
+@login_required
+@cache_control(private=True, max_age=5)
+@condition(etag_func=_dashboard_stats_etag)
+def dashboard_stats(request):
+    """
+    Estatísticas da dashboard em JSON (atualização periódica da página inicial).
+    
+    Enquanto os números não mudam o navegador recebe 304 sem corpo.
+    """
+    return JsonResponse(get_dashboard_stats())
+
+
 @login_required
 def student_detail(request, student_id):
     """View de detalhes de um aluno específico."""
     
     student = get_object_or_404(Student, pk=student_id)
     
-    # Eventos do aluno
+    # Eventos do aluno (apenas as colunas exibidas no template)
     events = MonitoringEvent.objects.filter(
         student=student
+    ).only(
+        'id', 'timestamp', 'event_type', 'url', 'app_name', 'window_title', 'browser'
     ).order_by('-timestamp')[:50]
     
     # Alertas do aluno
     alerts = Alert.objects.filter(
         student=student
+    ).only(
+        'id', 'title', 'severity', 'status', 'created_at'
     ).order_by('-created_at')[:30]
     
     # Estatísticas
@@ -106,11 +191,13 @@ def student_detail(request, student_id):
         timestamp__gte=timezone.now() - timedelta(hours=24)
     ).count()
     
-    total_alerts = Alert.objects.filter(student=student).count()
-    active_alerts_count = Alert.objects.filter(
-        student=student,
-        status__in=['new', 'reviewing']
-    ).count()
+    # Total de alertas e alertas ativos em uma única consulta
+    alert_counts = Alert.objects.filter(student=student).aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(status__in=['new', 'reviewing']))
+    )
+    total_alerts = alert_counts['total']
+    active_alerts_count = alert_counts['active']
     
     context = {
         'student': student,
@@ -132,7 +219,11 @@ def alerts_list(request):
     status_filter = request.GET.get('status', 'active')
     severity_filter = request.GET.get('severity', '')
     
-    alerts = Alert.objects.select_related('student', 'event')
+    # O template só exibe dados do aluno: evitar o JOIN com monitoring_events
+    alerts = Alert.objects.select_related('student').only(
+        'id', 'title', 'description', 'severity', 'status', 'created_at',
+        'student__name', 'student__registration_number'
+    )
     
     if status_filter == 'active':
         alerts = alerts.filter(status__in=['new', 'reviewing'])
@@ -163,7 +254,11 @@ def events_list(request):
     event_type = request.GET.get('type', '')
     student_id = request.GET.get('student', '')
     
-    events = MonitoringEvent.objects.select_related('student', 'exam_session')
+    # O template só exibe dados do aluno: evitar o JOIN com exam_sessions
+    events = MonitoringEvent.objects.select_related('student').only(
+        'id', 'timestamp', 'event_type', 'url', 'app_name', 'key_event', 'window_title',
+        'additional_data', 'browser', 'machine_name', 'ip_address', 'student__name'
+    )
     
     if event_type:
         events = events.filter(event_type=event_type)
@@ -174,7 +269,7 @@ def events_list(request):
     events = events.order_by('-timestamp')[:100]
     
     # Lista de alunos para o filtro
-    students = Student.objects.filter(is_active=True).order_by('name')
+    students = get_student_filter_choices()
     
     context = {
         'events': events,
@@ -187,6 +282,11 @@ def events_list(request):
     return render(request, 'dashboard/events_list.html', context)
 
 
+# Quantos eventos recentes (de todos os alunos) o live_monitor examina antes de
+# recorrer ao filtro por aluno
+LIVE_EVENTS_SCAN_LIMIT = 200
+
+
 @login_required
 def live_monitor(request):
     """View para monitoramento em tempo real."""
@@ -218,14 +318,26 @@ def live_monitor(request):
     
     # Contar totais
     online_count = len(students_status)
-    total_students = Student.objects.filter(is_active=True).count()
+    total_students = get_active_students_count()
     offline_count = total_students - online_count
     
     # Eventos recentes apenas dos alunos online (últimos 20)
-    online_student_ids = [s['student'].id for s in students_status]
-    recent_events = MonitoringEvent.objects.filter(
-        student_id__in=online_student_ids
-    ).select_related('student').order_by('-timestamp')[:20]
+    online_student_ids = {s['student'].id for s in students_status}
+    recent_events = []
+    if online_student_ids:
+        events_qs = MonitoringEvent.objects.select_related('student').only(
+            'id', 'timestamp', 'event_type', 'url', 'app_name', 'key_event', 'window_title',
+            'student__name', 'student__registration_number'
+        ).order_by('-timestamp')
+        
+        # Os eventos mais recentes de todos saem direto do índice de timestamp;
+        # filtrar os dos alunos online em Python evita o IN com toda a turma
+        latest = list(events_qs[:LIVE_EVENTS_SCAN_LIMIT])
+        recent_events = [e for e in latest if e.student_id in online_student_ids][:20]
+        
+        # Poucos alunos online no meio de muitos eventos: usar o filtro por IN
+        if len(recent_events) < 20 and len(latest) == LIVE_EVENTS_SCAN_LIMIT:
+            recent_events = list(events_qs.filter(student_id__in=online_student_ids)[:20])
     
     context = {
         'page_title': 'Monitoramento em Tempo Real',
@@ -7,19 +7,26 @@ Otimizado para grandes volumes de dados (500k+ registros).
 import os
 import sys
 import django
-from time import time
+from time import perf_counter
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 django.setup()
 
 from django.contrib.auth.models import User
 from django.db import connection, transaction
-from students.models import Student, ExamSession
-from monitoring.models import MonitoringEvent, Alert
 
 
-# Tamanho do lote para deleção em batch (quando necessário)
-BATCH_SIZE = 10_000
+# Tabelas limpas pelo script: (chave no resumo, tabela), na ordem de deleção
+# respeitando as foreign keys
+TABELAS = [
+    ('alertas', 'alerts'),
+    ('eventos', 'monitoring_events'),
+    ('sessoes_alunos', 'exam_sessions_students'),
+    ('sessoes', 'exam_sessions'),
+    ('heartbeats', 'student_heartbeats'),
+    ('alunos', 'students'),
+]
+TABELAS_PERMITIDAS = {tabela for _, tabela in TABELAS}
 
 
 def confirmar_limpeza():
@@ -44,29 +51,35 @@ def confirmar_limpeza():
     return resposta.strip().upper() == 'SIM'
 
 
-def delete_table_fast(table_name, model_class=None):
+def quote_tabela(table_name):
+    """
+    Valida o nome da tabela contra TABELAS e retorna o identificador escapado
+    para o banco em uso (nomes de tabela nunca vêm de fora da lista).
+    """
+    if table_name not in TABELAS_PERMITIDAS:
+        raise ValueError(f"Tabela não permitida para limpeza: {table_name}")
+    return connection.ops.quote_name(table_name)
+
+
+def delete_table_fast(table_name):
     """
     Deleta todos os registros de uma tabela de forma otimizada.
     Usa DELETE direto no SQL para máxima performance.
     """
-    # Contar registros antes
-    if model_class:
-        total = model_class.objects.count()
-    else:
-        with connection.cursor() as cursor:
-            cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-            total = cursor.fetchone()[0]
+    tabela = quote_tabela(table_name)
     
-    if total == 0:
-        return 0
-    
-    start_time = time()
+    start_time = perf_counter()
     
-    # Usar DELETE direto no SQL (muito mais rápido que ORM)
+    # Usar DELETE direto no SQL (muito mais rápido que ORM); o próprio DELETE
+    # informa quantas linhas removeu, sem precisar de um COUNT(*) antes
     with connection.cursor() as cursor:
-        cursor.execute(f"DELETE FROM {table_name}")
+        cursor.execute(f"DELETE FROM {tabela}")
+        total = cursor.rowcount
+    
+    if total == 0:
+        return 0
     
-    elapsed = time() - start_time
+    elapsed = perf_counter() - start_time
     speed = total / elapsed if elapsed > 0 else total
     
     print(f"  ✓ {table_name}: {total:,} registros deletados em {elapsed:.2f}s ({speed:,.0f}/s)")
@@ -74,124 +87,157 @@ def delete_table_fast(table_name, model_class=None):
     return total
 
 
-def delete_in_batches(model_class, table_name, batch_size=BATCH_SIZE):
+def truncar_tabelas():
     """
-    Deleta registros em lotes (fallback se DELETE direto falhar).
+    Esvazia todas as tabelas com um único TRUNCATE (PostgreSQL).
+    O TRUNCATE descarta os arquivos das tabelas em vez de apagar linha a linha.
+    As quantidades retornadas são estimativas do planner, não contagens exatas.
     """
-    total = model_class.objects.count()
-    if total == 0:
-        return 0
-    
-    print(f"  Deletando {total:,} registros de {table_name} em lotes...")
+    nomes = [quote_tabela(tabela) for _, tabela in TABELAS]
     
-    start_time = time()
-    deleted_count = 0
-    batch_num = 0
-    
-    while True:
-        # Buscar IDs do próximo lote
-        ids = list(model_class.objects.values_list('pk', flat=True)[:batch_size])
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Execução única: não esperar o flush do WAL no commit
+        cursor.execute("SET LOCAL synchronous_commit = off")
         
-        if not ids:
-            break
+        # TRUNCATE não informa quantas linhas removeu, e um COUNT(*) exato leria as
+        # tabelas inteiras: usar a estimativa do planner (pg_class.reltuples, -1 se
+        # a tabela nunca foi analisada)
+        cursor.execute(
+            "SELECT " + ", ".join(
+                "GREATEST((SELECT reltuples FROM pg_class WHERE oid = %s::regclass), 0)::bigint"
+                for _ in nomes
+            ),
+            nomes
+        )
+        counts = cursor.fetchone()
         
-        # Deletar lote
-        with transaction.atomic():
-            model_class.objects.filter(pk__in=ids).delete()
-        
-        deleted_count += len(ids)
-        batch_num += 1
-        
-        # Mostrar progresso a cada 5 lotes
-        if batch_num % 5 == 0:
-            progress = (deleted_count / total) * 100
-            elapsed = time() - start_time
-            speed = deleted_count / elapsed if elapsed > 0 else 0
-            print(f"    Progresso: {progress:.1f}% ({deleted_count:,}/{total:,}) - {speed:,.0f}/s")
+        print("Truncando tabelas...")
+        start_time = perf_counter()
+        cursor.execute(f"TRUNCATE TABLE {', '.join(nomes)} RESTART IDENTITY CASCADE")
+        elapsed = perf_counter() - start_time
     
-    elapsed = time() - start_time
-    speed = deleted_count / elapsed if elapsed > 0 else deleted_count
-    print(f"  ✓ {table_name}: {deleted_count:,} registros deletados em {elapsed:.2f}s ({speed:,.0f}/s)")
+    for (_, tabela), count in zip(TABELAS, counts):
+        print(f"  ✓ {tabela}: ~{count:,} registros (estimativa)")
+    print(f"  TRUNCATE concluído em {elapsed:.2f}s")
     
-    return deleted_count
+    return {chave: count for (chave, _), count in zip(TABELAS, counts)}
 
 
-def limpar_banco():
-    """Limpa todos os dados do banco de forma otimizada."""
+def deletar_em_fases():
+    """Deleta as tabelas uma a uma, na ordem das foreign keys (SQLite e demais bancos)."""
+    stats = {}
     
-    print("\n" + "=" * 70)
-    print("INICIANDO LIMPEZA OTIMIZADA")
-    print("=" * 70 + "\n")
+    # No SQLite, DELETE sem WHERE só usa a "truncate optimization" (descarta as
+    # páginas sem visitar cada linha) com a verificação de foreign keys desligada
+    constraints_disabled = connection.disable_constraint_checking()
     
-    total_start = time()
-    stats = {}
+    if connection.vendor == 'sqlite':
+        # Execução única: journal em memória e sem fsync, já que uma queda no meio
+        # da limpeza só exige rodar o script de novo. Precisa ser feito fora da transação.
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode = MEMORY")
+            cursor.execute("PRAGMA synchronous = OFF")
     
-    # ================================================================
-    # IMPORTANTE: Ordem de deleção respeitando foreign keys
-    # 1. Alertas (depende de MonitoringEvent e Student)
-    # 2. Eventos de Monitoramento (depende de Student e ExamSession)
-    # 3. Relação ManyToMany ExamSession <-> Student
-    # 4. Sessões de Exame
-    # 5. StudentHeartbeat (depende de Student)
-    # 6. Alunos
-    # ================================================================
+    try:
+        # Todas as fases em uma única transação: um só commit no final
+        with transaction.atomic():
+            # ================================================================
+            # IMPORTANTE: Ordem de deleção respeitando foreign keys
+            # 1. Alertas (depende de MonitoringEvent e Student)
+            # 2. Eventos de Monitoramento (depende de Student e ExamSession)
+            # 3. Relação ManyToMany ExamSession <-> Student
+            # 4. Sessões de Exame
+            # 5. StudentHeartbeat (depende de Student)
+            # 6. Alunos
+            # ================================================================
+            
+            print("Fase 1: Deletando Alertas...")
+            stats['alertas'] = delete_table_fast('alerts')
+            
+            print("\nFase 2: Deletando Eventos de Monitoramento...")
+            stats['eventos'] = delete_table_fast('monitoring_events')
+            
+            print("\nFase 3: Deletando relação Sessões-Alunos...")
+            # Tabela intermediária do ManyToMany
+            stats['sessoes_alunos'] = delete_table_fast('exam_sessions_students')
+            
+            print("\nFase 4: Deletando Sessões de Exame...")
+            stats['sessoes'] = delete_table_fast('exam_sessions')
+            
+            print("\nFase 5: Deletando Heartbeats...")
+            stats['heartbeats'] = delete_table_fast('student_heartbeats')
+            
+            print("\nFase 6: Deletando Alunos...")
+            stats['alunos'] = delete_table_fast('students')
     
-    print("Fase 1: Deletando Alertas...")
-    stats['alertas'] = delete_table_fast('alerts', Alert)
+    finally:
+        if constraints_disabled:
+            connection.enable_constraint_checking()
     
-    print("\nFase 2: Deletando Eventos de Monitoramento...")
-    stats['eventos'] = delete_table_fast('monitoring_events', MonitoringEvent)
+    return stats
+
+
+def otimizar_banco():
+    """
+    Libera o espaço das linhas deletadas, fora da transação da limpeza.
     
-    print("\nFase 3: Deletando relação Sessões-Alunos...")
-    # Tabela intermediária do ManyToMany
+    SQLite: com auto_vacuum=INCREMENTAL basta devolver as páginas livres
+    (PRAGMA incremental_vacuum), sem reescrever o arquivo inteiro. Bancos ainda
+    sem esse modo são convertidos com um último VACUUM completo, barato aqui
+    porque o banco acabou de ser esvaziado.
+    PostgreSQL: VACUUM ANALYZE, que também atualiza as estatísticas do planner.
+    """
     with connection.cursor() as cursor:
-        cursor.execute("SELECT COUNT(*) FROM exam_sessions_students")
-        count = cursor.fetchone()[0]
-    if count > 0:
-        start = time()
-        with connection.cursor() as cursor:
-            cursor.execute("DELETE FROM exam_sessions_students")
-        elapsed = time() - start
-        print(f"  ✓ exam_sessions_students: {count:,} registros deletados em {elapsed:.2f}s")
-    else:
-        print(f"  ✓ exam_sessions_students: 0 registros")
-    stats['sessoes_alunos'] = count
+        if connection.vendor == 'sqlite':
+            cursor.execute("PRAGMA freelist_count")
+            free_pages = cursor.fetchone()[0]
+            
+            cursor.execute("PRAGMA auto_vacuum")
+            if cursor.fetchone()[0] == 2:  # INCREMENTAL
+                # executescript roda o pragma até o fim; com execute() o sqlite3
+                # do Python dá um único passo e libera apenas uma página
+                cursor.executescript("PRAGMA incremental_vacuum;")
+            else:
+                print("  Convertendo banco para auto_vacuum incremental (VACUUM completo)...")
+                cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                cursor.execute("VACUUM")
+            
+            cursor.execute("PRAGMA freelist_count")
+            print(f"  ✓ Páginas livres recuperadas: {free_pages - cursor.fetchone()[0]:,}")
+        elif connection.vendor == 'postgresql':
+            cursor.execute("VACUUM ANALYZE")
+        else:
+            print(f"  - Banco {connection.vendor}: nenhuma otimização necessária")
+
+
+def limpar_banco():
+    """Limpa todos os dados do banco de forma otimizada."""
+    
+    print("\n" + "=" * 70)
+    print("INICIANDO LIMPEZA OTIMIZADA")
+    print("=" * 70 + "\n")
     
-    print("\nFase 4: Deletando Sessões de Exame...")
-    stats['sessoes'] = delete_table_fast('exam_sessions', ExamSession)
+    total_start = perf_counter()
     
-    print("\nFase 5: Deletando Heartbeats...")
-    with connection.cursor() as cursor:
-        cursor.execute("SELECT COUNT(*) FROM student_heartbeats")
-        count = cursor.fetchone()[0]
-    if count > 0:
-        start = time()
-        with connection.cursor() as cursor:
-            cursor.execute("DELETE FROM student_heartbeats")
-        elapsed = time() - start
-        print(f"  ✓ student_heartbeats: {count:,} registros deletados em {elapsed:.2f}s")
+    if connection.vendor == 'postgresql':
+        stats = truncar_tabelas()
     else:
-        print(f"  ✓ student_heartbeats: 0 registros")
-    stats['heartbeats'] = count
-    
-    print("\nFase 6: Deletando Alunos...")
-    stats['alunos'] = delete_table_fast('students', Student)
+        stats = deletar_em_fases()
     
     # Verificar usuários admin mantidos
     total_admins = User.objects.filter(is_superuser=True).count()
     
-    total_elapsed = time() - total_start
+    total_elapsed = perf_counter() - total_start
     
     # ================================================================
-    # VACUUM para liberar espaço no SQLite (opcional mas recomendado)
+    # VACUUM para liberar espaço (opcional mas recomendado)
     # ================================================================
     print("\nFase 7: Otimizando banco de dados (VACUUM)...")
     try:
-        start = time()
-        with connection.cursor() as cursor:
-            cursor.execute("VACUUM")
-        vacuum_time = time() - start
-        print(f"  ✓ VACUUM concluído em {vacuum_time:.2f}s")
+        start = perf_counter()
+        otimizar_banco()
+        vacuum_time = perf_counter() - start
+        print(f"  ✓ Otimização concluída em {vacuum_time:.2f}s")
     except Exception as e:
         print(f"  ⚠ VACUUM não executado: {e}")
     
@@ -202,7 +248,10 @@ def limpar_banco():
     print("  LIMPEZA CONCLUÍDA COM SUCESSO!")
     print("=" * 70)
     print()
-    print("📊 Resumo:")
+    if connection.vendor == 'postgresql':
+        print("📊 Resumo (quantidades aproximadas, estimadas pelo PostgreSQL):")
+    else:
+        print("📊 Resumo:")
     print(f"  • Alertas deletados: {stats['alertas']:,}")
     print(f"  • Eventos deletados: {stats['eventos']:,}")
     print(f"  • Relações sessão-aluno: {stats['sessoes_alunos']:,}")
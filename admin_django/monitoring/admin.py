@@ -12,7 +12,14 @@ class MonitoringEventAdmin(admin.ModelAdmin):
     list_filter = ['event_type', 'timestamp', 'browser', 'exam_session']
     search_fields = ['student__name', 'student__registration_number', 'url', 'app_name', 'window_title']
     readonly_fields = ['id', 'timestamp']
-    date_hierarchy = 'timestamp'
+    # Sem date_hierarchy: a navegação por ano/mês/dia faz SELECT DISTINCT sobre a data
+    # truncada de toda a tabela; o filtro de timestamp em list_filter já filtra por intervalo
+    # exam_session pode ser nulo e não entra no select_related automático da listagem
+    list_select_related = ['student', 'exam_session']
+    
+    def get_queryset(self, request):
+        # additional_data (JSON) não aparece na listagem; só é carregado no formulário
+        return super().get_queryset(request).defer('additional_data')
     
     def formatted_url_or_app(self, obj):
         if obj.url:
@@ -45,7 +52,9 @@ class AlertAdmin(admin.ModelAdmin):
     list_filter = ['severity', 'status', 'created_at']
     search_fields = ['title', 'description', 'student__name', 'student__registration_number']
     readonly_fields = ['id', 'event', 'student', 'created_at', 'updated_at']
-    date_hierarchy = 'created_at'
+    # Período filtrado por intervalo em list_filter (created_at), sem date_hierarchy
+    # A listagem só usa o id do evento: evitar o JOIN com monitoring_events
+    list_select_related = ['student']
     
     def severity_badge(self, obj):
         colors = {
@@ -76,7 +85,7 @@ class AlertAdmin(admin.ModelAdmin):
     status_badge.short_description = 'Status'
     
     def view_event(self, obj):
-        url = f'/admin/monitoring/monitoringevent/{obj.event.id}/change/'
+        url = f'/admin/monitoring/monitoringevent/{obj.event_id}/change/'
         return format_html('<a href="{}" target="_blank">Ver Evento</a>', url)
     view_event.short_description = 'Ação'
     
@@ -5,4 +5,6 @@ class MonitoringConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'monitoring'
     verbose_name = 'Monitoramento'
-
+    
+    def ready(self):
+        from . import signals  # noqa: F401
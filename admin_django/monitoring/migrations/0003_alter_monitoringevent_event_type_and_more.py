@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0002_monitoringevent_key_event_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='monitoringevent',
+            name='event_type',
+            field=models.CharField(choices=[('url_access', 'Acesso a URL'), ('app_launch', 'Abertura de Aplicativo'), ('window_change', 'Mudança de Janela'), ('copy_paste', 'Copiar/Colar'), ('screenshot', 'Screenshot Tentado'), ('keyboard_event', 'Evento de Teclado'), ('brightspace_event', 'Evento do Brightspace/AVA'), ('system', 'Evento do Sistema')], max_length=20, verbose_name='Tipo de Evento'),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(condition=models.Q(('status__in', ['new', 'reviewing'])), fields=['status', 'severity'], name='active_alerts_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0003_alter_monitoringevent_event_type_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['student', 'status', '-created_at'], name='alerts_student_36fa81_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monitoringevent',
+            index=models.Index(fields=['student', 'event_type', '-timestamp'], name='monitoring__student_e86d34_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monitoringevent',
+            index=models.Index(fields=['exam_session', '-timestamp'], name='monitoring__exam_se_c009c9_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0004_alert_alerts_student_36fa81_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(condition=models.Q(('status__in', ['new', 'reviewing'])), fields=['-created_at'], name='alerts_open_created_idx'),
+        ),
+    ]
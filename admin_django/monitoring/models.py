@@ -55,6 +55,9 @@ class MonitoringEvent(models.Model):
             models.Index(fields=['-timestamp']),
             models.Index(fields=['student', '-timestamp']),
             models.Index(fields=['event_type', '-timestamp']),
+            # Filtros combinados da API (aluno + tipo, sessão de exame) já na ordem de timestamp
+            models.Index(fields=['student', 'event_type', '-timestamp']),
+            models.Index(fields=['exam_session', '-timestamp']),
         ]
     
     def __str__(self):
@@ -105,6 +108,20 @@ class Alert(models.Model):
             models.Index(fields=['-created_at']),
             models.Index(fields=['status', '-created_at']),
             models.Index(fields=['severity', '-created_at']),
+            models.Index(fields=['student', 'status', '-created_at']),
+            # Índice parcial para os alertas ativos (contagens e listagens da dashboard)
+            models.Index(
+                fields=['status', 'severity'],
+                condition=models.Q(status__in=['new', 'reviewing']),
+                name='active_alerts_idx'
+            ),
+            # Listagens de alertas ativos mais recentes (AlertViewSet.active, tabela da
+            # página inicial): índice parcial só com os alertas em aberto
+            models.Index(
+                fields=['-created_at'],
+                condition=models.Q(status__in=['new', 'reviewing']),
+                name='alerts_open_created_idx'
+            ),
         ]
     
     def __str__(self):
@@ -0,0 +1,70 @@
+"""
+Notificação em tempo real de alertas (novos ou alterados) para a dashboard.
+"""
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+from dashboard.cache import invalidate_dashboard_stats
+
+logger = logging.getLogger(__name__)
+
+# Grupo do MonitoringConsumer (ws/monitoring/), ouvido pela página inicial da dashboard
+MONITORING_GROUP = 'monitoring_updates'
+
+
+def _send_alerts(payload):
+    """Envia um lote de alertas ao grupo de monitoramento."""
+    # Os contadores de alertas da dashboard são recalculados logo após o aviso, em vez
+    # de esperarem o fim do cache (invalidação limitada a uma a cada poucos segundos)
+    invalidate_dashboard_stats()
+    
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(MONITORING_GROUP, {
+            'type': 'monitoring_alert',
+            'data': {'alerts': payload}
+        })
+    except Exception as e:
+        # A notificação é só um atalho para a dashboard: nunca falhar a gravação por ela
+        logger.error(f"Erro ao notificar alertas: {e}", exc_info=True)
+
+
+def _alert_payload(alert):
+    """Resumo de um alerta para a mensagem do grupo (só colunas da instância)."""
+    return {
+        'id': str(alert.id),
+        'student': str(alert.student_id),
+        'severity': alert.severity,
+        'status': alert.status,
+        'title': alert.title,
+        'created_at': alert.created_at.isoformat() if alert.created_at else None,
+    }
+
+
+def notify_new_alerts(alerts):
+    """
+    Agenda o aviso dos alertas recém-criados para depois do COMMIT.
+    
+    Um único group_send por lote; a mensagem leva apenas colunas já presentes
+    nas instâncias (nenhuma consulta extra ao banco).
+    """
+    if not alerts:
+        return
+    payload = [_alert_payload(alert) for alert in alerts]
+    transaction.on_commit(lambda: _send_alerts(payload))
+
+
+def notify_alert_updated(alert):
+    """
+    Agenda o aviso de um alerta alterado (ex.: resolvido ou em revisão).
+    
+    Com o WebSocket conectado a dashboard não faz polling de alertas, então
+    mudanças de status também precisam ser avisadas para a tabela se atualizar.
+    """
+    payload = [_alert_payload(alert)]
+    transaction.on_commit(lambda: _send_alerts(payload))
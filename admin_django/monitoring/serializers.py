@@ -1,9 +1,53 @@
 """
 Serializers for Monitoring API.
 """
+import re
+
+from django.conf import settings
+from django.db import transaction
 from rest_framework import serializers
 from .models import MonitoringEvent, Alert
-from students.models import Student
+from .notifications import notify_new_alerts
+from students.cache import get_student_by_registration
+
+
+def _compile_patterns(patterns):
+    """
+    Junta uma lista de padrões literais em uma única regex (sem diferenciar maiúsculas).
+    
+    Uma chamada a search() percorre o texto uma vez no motor C do re, em vez de
+    um teste de substring em Python para cada padrão. Lista vazia nunca casa.
+    """
+    if not patterns:
+        return re.compile(r'(?!)')
+    return re.compile('|'.join(map(re.escape, patterns)), re.IGNORECASE)
+
+
+# Listas de padrões da detecção de alertas, compiladas uma única vez na importação
+_ALLOWED_URLS_RE = _compile_patterns(settings.ALLOWED_URLS)
+_SUSPICIOUS_KEYWORDS_RE = _compile_patterns(settings.SUSPICIOUS_KEYWORDS)
+_SUSPICIOUS_APPS_RE = _compile_patterns(settings.SUSPICIOUS_APPS)
+
+# Textos fixos dos alertas: apenas a parte variável é formatada a cada evento
+_URL_ALERT = ("Acesso a URL não permitida", "URL não está na whitelist de sites permitidos")
+_URL_ALERT_DESCRIPTION_FMT = "Aluno acessou URL fora da lista permitida: {}"
+_URL_KEYWORD_REASON_FMT = _URL_ALERT[1] + " e contém palavra-chave suspeita: '{}'"
+_APP_ALERT_TITLE = "Aplicativo suspeito detectado"
+_APP_ALERT_DESCRIPTION_FMT = "Aluno abriu aplicativo: {}"
+_APP_ALERT_FMT = "Aplicativo '{}' pode ser usado para trapaça"
+
+
+def _insert_events(events, alerts):
+    """
+    Grava eventos e alertas montados em memória, na mesma transação.
+    
+    Os ids (UUID) já são gerados na instância, então os alertas referenciam
+    seus eventos sem esperar o retorno do INSERT.
+    """
+    with transaction.atomic():
+        MonitoringEvent.objects.bulk_create(events, batch_size=500)
+        Alert.objects.bulk_create(alerts, batch_size=500)
+        notify_new_alerts(alerts)
 
 
 class MonitoringEventSerializer(serializers.ModelSerializer):
@@ -21,6 +65,27 @@ class MonitoringEventSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'timestamp', 'student_name']
 
 
+class MonitoringEventBulkCreateSerializer(serializers.ListSerializer):
+    """Serializer para criação de eventos em lote via API do script."""
+    
+    def create(self, validated_data):
+        """Cria os eventos e os alertas do lote com um INSERT em lote para cada tabela."""
+        ip_address = self.child._get_ip_address()
+        
+        events = [
+            MonitoringEvent(
+                student=self.context['students'][data.pop('registration_number')],
+                ip_address=ip_address,
+                **data
+            )
+            for data in validated_data
+        ]
+        alerts = [alert for alert in map(self.child._build_alert, events) if alert is not None]
+        _insert_events(events, alerts)
+        
+        return events
+
+
 class MonitoringEventCreateSerializer(serializers.Serializer):
     """Serializer para criação de eventos via API do script."""
     
@@ -34,44 +99,55 @@ class MonitoringEventCreateSerializer(serializers.Serializer):
     machine_name = serializers.CharField(required=False, allow_blank=True, max_length=200)
     additional_data = serializers.JSONField(required=False, default=dict)
     
+    class Meta:
+        list_serializer_class = MonitoringEventBulkCreateSerializer
+    
     def validate_registration_number(self, value):
         """Valida a matrícula do aluno."""
-        try:
-            student = Student.objects.get(registration_number=value, is_active=True)
-            self.context['student'] = student
-            return value
-        except Student.DoesNotExist:
-            raise serializers.ValidationError("Matrícula não encontrada ou aluno inativo.")
+        # Alunos já validados ficam no contexto: um lote com a mesma matrícula
+        # repetida busca o aluno uma única vez
+        students = self.context.setdefault('students', {})
+        if value not in students:
+            student = get_student_by_registration(value)
+            if student is None or not student.is_active:
+                raise serializers.ValidationError("Matrícula não encontrada ou aluno inativo.")
+            students[value] = student
+        return value
+    
+    def _get_ip_address(self):
+        """Retorna o IP de origem da requisição (ou None fora de uma requisição)."""
+        request = self.context.get('request')
+        if not request:
+            return None
+        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+        if x_forwarded_for:
+            return x_forwarded_for.split(',')[0]
+        return request.META.get('REMOTE_ADDR')
     
     def create(self, validated_data):
         """Cria o evento de monitoramento."""
-        validated_data.pop('registration_number')
-        student = self.context['student']
+        student = self.context['students'][validated_data.pop('registration_number')]
         
         # Obter IP da requisição
-        request = self.context.get('request')
-        if request:
-            x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-            if x_forwarded_for:
-                ip_address = x_forwarded_for.split(',')[0]
-            else:
-                ip_address = request.META.get('REMOTE_ADDR')
-            validated_data['ip_address'] = ip_address
+        validated_data['ip_address'] = self._get_ip_address()
         
-        event = MonitoringEvent.objects.create(
-            student=student,
-            **validated_data
-        )
+        event = MonitoringEvent(student=student, **validated_data)
         
         # Verificar se deve criar alerta
-        self._check_and_create_alert(event)
+        alert = self._build_alert(event)
+        
+        # Evento e eventual alerta são gravados na mesma transação
+        _insert_events([event], [alert] if alert is not None else [])
         
         return event
     
-    def _check_and_create_alert(self, event):
-        """Verifica se o evento deve gerar um alerta."""
-        from django.conf import settings
+    def _build_alert(self, event):
+        """
+        Verifica se o evento deve gerar um alerta.
         
+        Retorna o Alert ainda não gravado (ou None). Não acessa o banco, então
+        também serve para eventos de um lote que ainda não foram inseridos.
+        """
         should_alert = False
         alert_title = ""
         alert_description = ""
@@ -80,43 +156,27 @@ class MonitoringEventCreateSerializer(serializers.Serializer):
         
         # Verificar acesso a URL não permitida
         if event.event_type == 'url_access' and event.url:
-            allowed = False
-            for allowed_url in settings.ALLOWED_URLS:
-                if allowed_url in event.url.lower():
-                    allowed = True
-                    break
+            allowed = _ALLOWED_URLS_RE.search(event.url) is not None
             
             if not allowed:
                 should_alert = True
-                alert_title = "Acesso a URL não permitida"
-                alert_description = f"Aluno acessou URL fora da lista permitida: {event.url}"
-                alert_reason = "URL não está na whitelist de sites permitidos"
+                alert_title, alert_reason = _URL_ALERT
+                alert_description = _URL_ALERT_DESCRIPTION_FMT.format(event.url)
                 
                 # Verificar palavras-chave suspeitas para aumentar severidade
-                url_lower = event.url.lower()
-                for keyword in settings.SUSPICIOUS_KEYWORDS:
-                    if keyword in url_lower:
-                        severity = "high"
-                        alert_reason += f" e contém palavra-chave suspeita: '{keyword}'"
-                        break
+                match = _SUSPICIOUS_KEYWORDS_RE.search(event.url)
+                if match:
+                    severity = "high"
+                    alert_reason = _URL_KEYWORD_REASON_FMT.format(match.group(0).lower())
         
         # Verificar abertura de aplicativo
         elif event.event_type == 'app_launch' and event.app_name:
-            suspicious_apps = [
-                'whatsapp', 'telegram', 'discord', 'slack', 'teams',
-                'notepad++', 'vscode', 'pycharm', 'visualstudio',
-                'cmd', 
-            ]
-            
-            app_lower = event.app_name.lower()
-            for sus_app in suspicious_apps:
-                if sus_app in app_lower:
-                    should_alert = True
-                    alert_title = "Aplicativo suspeito detectado"
-                    alert_description = f"Aluno abriu aplicativo: {event.app_name}"
-                    alert_reason = f"Aplicativo '{event.app_name}' pode ser usado para trapaça"
-                    severity = "medium"
-                    break
+            if _SUSPICIOUS_APPS_RE.search(event.app_name):
+                should_alert = True
+                alert_title = _APP_ALERT_TITLE
+                alert_description = _APP_ALERT_DESCRIPTION_FMT.format(event.app_name)
+                alert_reason = _APP_ALERT_FMT.format(event.app_name)
+                severity = "medium"
         
         # Verificar eventos de teclado
         elif event.event_type == 'keyboard_event' and event.key_event:
@@ -194,9 +254,9 @@ class MonitoringEventCreateSerializer(serializers.Serializer):
                     alert_description = additional_data.get('message', 'Evento suspeito no Brightspace')
                     alert_reason = additional_data.get('alert_reason', 'Evento marcado como alerta pelo sistema')
         
-        # Criar alerta se necessário
+        # Montar alerta se necessário
         if should_alert:
-            Alert.objects.create(
+            return Alert(
                 event=event,
                 student=event.student,
                 severity=severity,
@@ -204,6 +264,7 @@ class MonitoringEventCreateSerializer(serializers.Serializer):
                 description=alert_description,
                 reason=alert_reason
             )
+        return None
 
 
 class AlertSerializer(serializers.ModelSerializer):
@@ -221,3 +282,13 @@ class AlertSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
+
+class ActiveAlertSerializer(serializers.ModelSerializer):
+    """Serializer resumido para a listagem de alertas ativos."""
+    
+    student_name = serializers.CharField(source='student.name', read_only=True)
+    
+    class Meta:
+        model = Alert
+        fields = ['id', 'student', 'student_name', 'severity', 'status', 'title', 'created_at']
+        read_only_fields = fields
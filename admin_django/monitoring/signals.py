@@ -0,0 +1,21 @@
+"""
+Signals de monitoramento.
+"""
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Alert
+from .notifications import notify_alert_updated
+
+
+@receiver(post_save, sender=Alert)
+def alert_saved(sender, instance, created, **kwargs):
+    """
+    Avisa a dashboard quando um alerta existente é alterado.
+    
+    Alertas novos já são avisados por notify_new_alerts (inclusive os gravados
+    com bulk_create, que não disparam post_save).
+    """
+    if created:
+        return
+    notify_alert_updated(instance)
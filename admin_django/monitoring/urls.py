@@ -7,6 +7,7 @@ from .views import (
     MonitoringEventViewSet,
     AlertViewSet,
     report_event,
+    report_events_bulk,
     create_alert,
     heartbeat
 )
@@ -18,6 +19,7 @@ router.register(r'alerts', AlertViewSet, basename='alert')
 urlpatterns = [
     path('', include(router.urls)),
     path('report/', report_event, name='report_event'),
+    path('report/bulk/', report_events_bulk, name='report_events_bulk'),
     path('alert/', create_alert, name='create_alert'),
     path('heartbeat/', heartbeat, name='heartbeat'),
 ]
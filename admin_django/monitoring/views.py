@@ -3,29 +3,51 @@ Views for Monitoring API.
 """
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db import transaction
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from django.db.models import Count, Q
 from django.utils import timezone
 from datetime import timedelta
+import orjson
 
 from .models import MonitoringEvent, Alert
+from .notifications import notify_new_alerts
 from .serializers import (
     MonitoringEventSerializer, 
     MonitoringEventCreateSerializer,
-    AlertSerializer
+    AlertSerializer,
+    ActiveAlertSerializer
 )
+from students.cache import get_student_by_registration
 from students.models import Student
 
 
+class EventCursorPagination(CursorPagination):
+    """
+    Paginação por cursor na ordem de timestamp.
+    
+    Cada página continua a partir do último timestamp visto (índice -timestamp),
+    sem o OFFSET nem o COUNT(*) da paginação por número de página.
+    """
+    ordering = '-timestamp'
+
+
 class MonitoringEventViewSet(viewsets.ModelViewSet):
     """ViewSet para eventos de monitoramento."""
     
-    queryset = MonitoringEvent.objects.all().select_related('student', 'exam_session')
+    # exam_session é serializado apenas pelo id: o JOIN com a sessão não é necessário
+    queryset = MonitoringEvent.objects.all().select_related('student')
     serializer_class = MonitoringEventSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['student', 'event_type', 'exam_session']
+    pagination_class = EventCursorPagination
     
     @action(detail=False, methods=['get'])
     def recent(self, request):
@@ -33,8 +55,9 @@ class MonitoringEventViewSet(viewsets.ModelViewSet):
         time_threshold = timezone.now() - timedelta(hours=24)
         recent_events = self.queryset.filter(timestamp__gte=time_threshold)
         
-        serializer = self.get_serializer(recent_events, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(recent_events)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def by_student(self, request):
@@ -47,14 +70,16 @@ class MonitoringEventViewSet(viewsets.ModelViewSet):
             )
         
         events = self.queryset.filter(student_id=student_id)
-        serializer = self.get_serializer(events, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(events)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
 class AlertViewSet(viewsets.ModelViewSet):
     """ViewSet para alertas."""
     
-    queryset = Alert.objects.all().select_related('student', 'event')
+    # event__student: o nome do aluno também é exibido nos detalhes do evento aninhado
+    queryset = Alert.objects.all().select_related('student', 'event', 'event__student')
     serializer_class = AlertSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
@@ -62,10 +87,14 @@ class AlertViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def active(self, request):
-        """Retorna alertas ativos (novos ou em revisão)."""
-        active_alerts = self.queryset.filter(status__in=['new', 'reviewing'])
-        serializer = self.get_serializer(active_alerts, many=True)
-        return Response(serializer.data)
+        """Retorna alertas ativos (novos ou em revisão), em formato resumido."""
+        # Apenas as colunas do resumo: sem o JOIN com o evento e sem os demais dados do aluno
+        active_alerts = Alert.objects.select_related('student').only(
+            'id', 'student__name', 'severity', 'status', 'title', 'created_at'
+        ).filter(status__in=['new', 'reviewing'])
+        page = self.paginate_queryset(active_alerts)
+        serializer = ActiveAlertSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=True, methods=['post'])
     def resolve(self, request, pk=None):
@@ -84,20 +113,23 @@ class AlertViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Retorna estatísticas de alertas."""
-        total = self.queryset.count()
-        by_severity = {}
-        by_status = {}
-        
+        # Todas as contagens (total, por severidade e por status) em uma única consulta
+        aggregates = {'total': Count('id')}
         for severity, _ in Alert.SEVERITY_LEVELS:
-            by_severity[severity] = self.queryset.filter(severity=severity).count()
-        
+            aggregates[f'severity_{severity}'] = Count('id', filter=Q(severity=severity))
         for status_val, _ in Alert.STATUS_CHOICES:
-            by_status[status_val] = self.queryset.filter(status=status_val).count()
+            aggregates[f'status_{status_val}'] = Count('id', filter=Q(status=status_val))
+        
+        counts = Alert.objects.aggregate(**aggregates)
         
         return Response({
-            'total': total,
-            'by_severity': by_severity,
-            'by_status': by_status
+            'total': counts['total'],
+            'by_severity': {
+                severity: counts[f'severity_{severity}'] for severity, _ in Alert.SEVERITY_LEVELS
+            },
+            'by_status': {
+                status_val: counts[f'status_{status_val}'] for status_val, _ in Alert.STATUS_CHOICES
+            }
         })
 
 
@@ -133,6 +165,51 @@ def report_event(request):
     )
 
 
+# Quantidade máxima de eventos aceitos em uma única chamada de report_events_bulk
+REPORT_BULK_MAX_EVENTS = 500
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def report_events_bulk(request):
+    """
+    Endpoint público para o script do aluno reportar vários eventos de uma vez.
+    Recebe {"events": [...]}, cada item no mesmo formato de report_event.
+    """
+    events = request.data.get('events') if isinstance(request.data, dict) else None
+    if not events:
+        return Response(
+            {'error': 'events list is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    serializer = MonitoringEventCreateSerializer(
+        data=events,
+        many=True,
+        max_length=REPORT_BULK_MAX_EVENTS,
+        context={'request': request}
+    )
+    
+    if serializer.is_valid():
+        created_events = serializer.save()
+        return Response(
+            {
+                'status': 'success',
+                'event_ids': [str(event.id) for event in created_events],
+                'message': f'{len(created_events)} eventos registrados com sucesso'
+            },
+            status=status.HTTP_201_CREATED
+        )
+    
+    return Response(
+        {
+            'status': 'error',
+            'errors': serializer.errors
+        },
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def create_alert(request):
@@ -147,17 +224,16 @@ def create_alert(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    try:
-        student = Student.objects.get(registration_number=registration_number)
-    except Student.DoesNotExist:
+    student = get_student_by_registration(registration_number)
+    if student is None:
         return Response(
             {'error': 'Student not found'},
             status=status.HTTP_404_NOT_FOUND
         )
     
-    # Criar evento primeiro
+    # Criar evento primeiro (apenas o id do aluno: o cache já dispensa o SELECT)
     event_data = {
-        'student': student.id,
+        'student_id': student.id,
         'event_type': request.data.get('event_type', 'system'),
         'url': request.data.get('url', ''),
         'browser': request.data.get('browser', ''),
@@ -174,19 +250,22 @@ def create_alert(request):
     else:
         event_data['ip_address'] = request.META.get('REMOTE_ADDR')
     
-    event = MonitoringEvent.objects.create(**event_data)
-    
-    # Criar alerta
-    alert_data = {
-        'event': event,
-        'student': student,
-        'severity': request.data.get('severity', 'medium'),
-        'title': request.data.get('title', 'Alerta de Segurança'),
-        'description': request.data.get('description', ''),
-        'reason': request.data.get('reason', '')
-    }
-    
-    alert = Alert.objects.create(**alert_data)
+    # Evento e alerta são gravados na mesma transação (um único COMMIT)
+    with transaction.atomic():
+        event = MonitoringEvent.objects.create(**event_data)
+        
+        # Criar alerta
+        alert_data = {
+            'event': event,
+            'student_id': student.id,
+            'severity': request.data.get('severity', 'medium'),
+            'title': request.data.get('title', 'Alerta de Segurança'),
+            'description': request.data.get('description', ''),
+            'reason': request.data.get('reason', '')
+        }
+        
+        alert = Alert.objects.create(**alert_data)
+        notify_new_alerts([alert])
     
     return Response({
         'status': 'success',
@@ -196,24 +275,43 @@ def create_alert(request):
     }, status=status.HTTP_201_CREATED)
 
 
-@api_view(['POST'])
-@permission_classes([AllowAny])
+def _json_response(data, status=200):
+    """Resposta JSON serializada com orjson, sem passar pelos renderers do DRF."""
+    return HttpResponse(orjson.dumps(data), status=status, content_type='application/json')
+
+
+@csrf_exempt
+@require_POST
 def heartbeat(request):
     """
     Endpoint para o script enviar heartbeat (confirmar que está ativo).
     Cria o aluno automaticamente se não existir.
+    
+    Chamado a cada poucos segundos por cada aluno: é uma view Django simples,
+    sem a negociação de conteúdo e os renderers de uma view do DRF.
     """
     from students.models import StudentHeartbeat
     
-    registration_number = request.data.get('registration_number')
-    student_name = request.data.get('student_name')
-    student_email = request.data.get('student_email')
-    machine_name = request.data.get('machine_name', '')
+    # O script envia JSON; formulários continuam aceitos como no @api_view
+    if request.content_type == 'application/json':
+        try:
+            data = orjson.loads(request.body or b'{}')
+        except orjson.JSONDecodeError:
+            return _json_response({'error': 'JSON inválido'}, status=400)
+        if not isinstance(data, dict):
+            return _json_response({'error': 'JSON inválido'}, status=400)
+    else:
+        data = request.POST
+    
+    registration_number = data.get('registration_number')
+    student_name = data.get('student_name')
+    student_email = data.get('student_email')
+    machine_name = data.get('machine_name', '')
     
     if not registration_number:
-        return Response(
+        return _json_response(
             {'error': 'registration_number is required'},
-            status=status.HTTP_400_BAD_REQUEST
+            status=400
         )
     
     # Obter IP do cliente
@@ -223,27 +321,26 @@ def heartbeat(request):
     else:
         ip_address = request.META.get('REMOTE_ADDR')
     
-    try:
-        # Tentar buscar o aluno
-        student = Student.objects.get(registration_number=registration_number)
-        
+    # Tentar buscar o aluno (reaproveitado do cache entre heartbeats)
+    student = get_student_by_registration(registration_number)
+    
+    if student is not None:
         # Verificar se está ativo
         if not student.is_active:
-            return Response(
+            return _json_response(
                 {'error': 'Aluno inativo. Entre em contato com a administração.'},
-                status=status.HTTP_401_UNAUTHORIZED
+                status=401
             )
         
-        # Atualizar ou criar heartbeat
-        heartbeat_obj, created = StudentHeartbeat.objects.update_or_create(
-            student=student,
-            defaults={
-                'machine_name': machine_name,
-                'ip_address': ip_address
-            }
+        # Atualizar ou criar heartbeat em um único INSERT ... ON CONFLICT (student_id) DO UPDATE
+        StudentHeartbeat.objects.bulk_create(
+            [StudentHeartbeat(student=student, machine_name=machine_name, ip_address=ip_address)],
+            update_conflicts=True,
+            unique_fields=['student'],
+            update_fields=['last_heartbeat', 'machine_name', 'ip_address']
         )
         
-        return Response({
+        return _json_response({
             'status': 'success',
             'student': student.name,
             'student_registration': student.registration_number,
@@ -251,38 +348,36 @@ def heartbeat(request):
             'new_student': False,
             'heartbeat_registered': True
         })
-        
-    except Student.DoesNotExist:
-        # Se não existir, criar automaticamente
-        if not student_name or not student_email:
-            return Response({
-                'error': 'Aluno não cadastrado',
-                'requires_registration': True,
-                'message': 'Por favor, informe seu nome e email'
-            }, status=status.HTTP_404_NOT_FOUND)
-        
-        # Criar novo aluno
-        student = Student.objects.create(
-            registration_number=registration_number,
-            name=student_name,
-            email=student_email,
-            is_active=True
-        )
-        
-        # Criar heartbeat inicial
-        StudentHeartbeat.objects.create(
-            student=student,
-            machine_name=machine_name,
-            ip_address=ip_address
-        )
-        
-        return Response({
-            'status': 'success',
-            'student': student.name,
-            'student_registration': student.registration_number,
-            'monitoring_active': True,
-            'new_student': True,
-            'heartbeat_registered': True,
-            'message': 'Aluno cadastrado com sucesso!'
-        }, status=status.HTTP_201_CREATED)
-
+    
+    # Se não existir, criar automaticamente
+    if not student_name or not student_email:
+        return _json_response({
+            'error': 'Aluno não cadastrado',
+            'requires_registration': True,
+            'message': 'Por favor, informe seu nome e email'
+        }, status=404)
+    
+    # Criar novo aluno
+    student = Student.objects.create(
+        registration_number=registration_number,
+        name=student_name,
+        email=student_email,
+        is_active=True
+    )
+    
+    # Criar heartbeat inicial
+    StudentHeartbeat.objects.create(
+        student=student,
+        machine_name=machine_name,
+        ip_address=ip_address
+    )
+    
+    return _json_response({
+        'status': 'success',
+        'student': student.name,
+        'student_registration': student.registration_number,
+        'monitoring_active': True,
+        'new_student': True,
+        'heartbeat_registered': True,
+        'message': 'Aluno cadastrado com sucesso!'
+    }, status=201)
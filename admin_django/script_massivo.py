@@ -1,28 +1,70 @@
 """
 Script para criar 500.000 registros de eventos e alertas em massa.
-Utiliza bulk_create para máxima eficiência.
+No PostgreSQL os lotes são gravados com COPY FROM STDIN (ou, com MASSIVO_USE_COPY=False,
+INSERTs de várias linhas via execute_values); nos demais bancos, com executemany.
 """
+import csv
+import gc
+import io
 import os
 import sys
 import django
-import random
 import uuid
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from time import time
 
+import numpy as np
+import orjson
+from decouple import config
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
 # Configurar Django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 django.setup()
 
 from students.models import Student, ExamSession
 from monitoring.models import MonitoringEvent, Alert
+from django.db import connection, transaction
+from django.db.models import Count
 from django.utils import timezone
 
 
-# Configurações
+# Configurações (lote, sessões COPY e processos de geração ajustáveis por variável de ambiente)
 TOTAL_EVENTS = 500_000
 TOTAL_ALERTS = 500_000
-BATCH_SIZE = 10_000  # Inserir em lotes de 10.000 registros
+BATCH_SIZE = config('MASSIVO_BATCH_SIZE', default=10_000, cast=int)  # Registros por lote
+
+# Sessões COPY simultâneas no PostgreSQL, cada uma com a própria conexão
+COPY_CONCURRENCY = config('MASSIVO_COPY_CONCURRENCY', default=4, cast=int)
+
+# COPY desligado (ex.: pgbouncer em modo transaction): PostgreSQL recebe INSERTs de várias linhas
+USE_COPY = config('MASSIVO_USE_COPY', default=True, cast=bool)
+VALUES_PAGE_SIZE = 5_000  # Linhas por INSERT no execute_values
+
+# Colunas gravadas em cada lote (attname dos campos, na ordem das tuplas geradas)
+EVENT_COLUMNS = [
+    'id', 'student_id', 'exam_session_id', 'event_type', 'timestamp', 'url', 'browser',
+    'app_name', 'window_title', 'key_event', 'machine_name', 'ip_address', 'additional_data',
+]
+ALERT_COLUMNS = [
+    'id', 'event_id', 'student_id', 'severity', 'status', 'title', 'description', 'reason',
+    'created_at', 'updated_at', 'resolved_at', 'admin_notes',
+]
+
+# Processos gerando os próximos lotes de eventos enquanto os atuais são gravados
+GENERATION_WORKERS = config(
+    'MASSIVO_GENERATION_WORKERS', default=max(1, (os.cpu_count() or 2) - 1), cast=int
+)
+
+# Marcador de NULL no COPY (formato CSV)
+COPY_NULL = r'\N'
+
+# Semente dos sorteios (MASSIVO_SEED) para repetir uma carga; sem ela cada execução sorteia dados novos
+SEED = config('MASSIVO_SEED', default='', cast=lambda value: int(value) if value else None)
 
 
 # Dados para geração aleatória
@@ -138,25 +180,337 @@ ALERT_REASONS = [
 ]
 
 
+# Listas de escolha como arrays: os sorteios de cada lote são feitos de uma vez pelo NumPy
+# Cada lote recebe um gerador próprio, com semente derivada desta sequência
+SEED_SEQUENCE = np.random.SeedSequence(SEED)
+# dtype=object: os arrays guardam referências às próprias strings das listas, então cada
+# coluna sorteada (tolist) repete essas poucas strings em vez de criar uma str por linha
+EVENT_TYPES_ARR = np.array(EVENT_TYPES, dtype=object)
+URLS_ARR = np.array(URLS, dtype=object)
+BROWSERS_ARR = np.array(BROWSERS, dtype=object)
+APPS_ARR = np.array(APPS, dtype=object)
+WINDOW_TITLES_ARR = np.array(WINDOW_TITLES, dtype=object)
+KEY_EVENTS_ARR = np.array(KEY_EVENTS, dtype=object)
+MACHINE_NAMES_ARR = np.array(MACHINE_NAMES, dtype=object)
+IP_ADDRESSES_ARR = np.array(IP_ADDRESSES, dtype=object)
+ALERT_SEVERITIES_ARR = np.array(ALERT_SEVERITIES, dtype=object)
+ALERT_STATUSES_ARR = np.array(ALERT_STATUSES, dtype=object)
+ALERT_TITLES_ARR = np.array(ALERT_TITLES, dtype=object)
+ALERT_DESCRIPTIONS_ARR = np.array(ALERT_DESCRIPTIONS, dtype=object)
+ALERT_REASONS_ARR = np.array(ALERT_REASONS, dtype=object)
+
+# Peso maior para severidades médias: low, medium, high, critical
+ALERT_SEVERITY_WEIGHTS = [0.2, 0.4, 0.3, 0.1]
+# Peso maior para alertas novos: new, reviewing, resolved, false_positive
+ALERT_STATUS_WEIGHTS = [0.6, 0.2, 0.15, 0.05]
+
+
+def _choice(rng, values, size):
+    """Sorteia size valores de um array (escolha uniforme com reposição)."""
+    return values[rng.integers(0, len(values), size)]
+
+
+def _uuid_bytes(size):
+    """Gera os bytes de size UUIDs versão 4 (matriz size x 16) com uma única leitura de os.urandom."""
+    raw = np.frombuffer(os.urandom(16 * size), dtype=np.uint8).reshape(size, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # Versão 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # Variante RFC 4122
+    return raw
+
+
+def _uuid_hex(raw):
+    """
+    Converte uma matriz de bytes de UUIDs (n x 16) nos textos hexadecimais de 32 dígitos.
+    
+    O PostgreSQL (COPY) e o UUIDField (get_db_prep_save) aceitam essa forma, então
+    nenhum objeto UUID é criado.
+    """
+    data = raw.tobytes().hex()
+    return [data[j:j + 32] for j in range(0, len(data), 32)]
+
+
+@contextmanager
+def gc_paused():
+    """
+    Suspende o coletor de ciclos enquanto um lote é montado.
+    
+    Cada lote cria dezenas de milhares de tuplas, dicts e UUIDs de uma vez, o que
+    dispara coletas seguidas que não encontram nada: as linhas não formam ciclos.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _copy_value(value):
+    """Converte um valor para o texto esperado pelo COPY em formato CSV."""
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, dict):
+        return orjson.dumps(value).decode('utf-8')
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def bulk_copy(model, rows, columns, table=None):
+    """
+    Insere as linhas (tuplas na ordem de columns) na tabela do model quando o
+    COPY não é usado (os lotes do COPY são gravados pelo BatchWriter).
+    
+    No PostgreSQL com MASSIVO_USE_COPY=False, em INSERTs de várias linhas
+    (bulk_insert_values; em table, se informada, ex.: a tabela de staging).
+    Nos demais bancos (SQLite do ambiente de desenvolvimento), com executemany
+    (bulk_insert_prepared).
+    """
+    if connection.vendor != 'postgresql':
+        bulk_insert_prepared(model, rows, columns, table)
+        return
+    
+    bulk_insert_values(model, rows, columns, table)
+
+
+def bulk_insert_prepared(model, rows, columns, table=None):
+    """
+    Insere as linhas com executemany (SQLite e demais bancos).
+    
+    Cada valor é convertido por get_db_prep_save do campo, como no bulk_create,
+    mas sem o pre_save: auto_now/auto_now_add não sobrescrevem os timestamps
+    sorteados (mesmo resultado do COPY no PostgreSQL).
+    """
+    quote_name = connection.ops.quote_name
+    fields = [model._meta.get_field(column) for column in columns]
+    table = quote_name(table or model._meta.db_table)
+    column_names = ', '.join(quote_name(field.column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    values = [
+        tuple(field.get_db_prep_save(value, connection) for field, value in zip(fields, row))
+        for row in rows
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(f"INSERT INTO {table} ({column_names}) VALUES ({placeholders})", values)
+
+
+def bulk_insert_values(model, rows, columns, table=None):
+    """
+    Insere as linhas com execute_values do psycopg2 (PostgreSQL sem COPY).
+    
+    Cada INSERT leva VALUES_PAGE_SIZE linhas em uma única instrução, em vez de
+    uma ida ao banco por linha como no executemany.
+    """
+    quote_name = connection.ops.quote_name
+    table = quote_name(table or model._meta.db_table)
+    column_names = ', '.join(quote_name(model._meta.get_field(column).column) for column in columns)
+    # JSON como texto: o literal é convertido para o tipo da coluna pelo PostgreSQL
+    values = [
+        tuple(orjson.dumps(value).decode('utf-8') if isinstance(value, dict) else value for value in row)
+        for row in rows
+    ]
+    with connection.cursor() as cursor:
+        execute_values(
+            cursor.cursor,
+            f"INSERT INTO {table} ({column_names}) VALUES %s",
+            values,
+            page_size=VALUES_PAGE_SIZE
+        )
+
+
+def _copy_text(rows):
+    """
+    Formata as linhas como o CSV lido pelo COPY FROM STDIN, já codificado em UTF-8.
+    
+    O CSV é codificado à medida que é escrito, sem uma str intermediária do lote
+    inteiro; os bytes passam entre processos sem recodificação e são lidos pelo
+    COPY sem cópia (_copy_batch).
+    """
+    buffer = io.BytesIO()
+    text_buffer = io.TextIOWrapper(buffer, encoding='utf-8', newline='')
+    writer = csv.writer(text_buffer, lineterminator='\n')
+    writer.writerows([_copy_value(value) for value in row] for row in rows)
+    text_buffer.flush()
+    text_buffer.detach()
+    return buffer.getvalue()
+
+
+def _copy_sql(model, columns, table=None):
+    """Comando COPY FROM STDIN (CSV) para as colunas do model, na tabela do model ou em table."""
+    quote_name = connection.ops.quote_name
+    table = quote_name(table or model._meta.db_table)
+    column_names = ', '.join(quote_name(model._meta.get_field(column).column) for column in columns)
+    return f"COPY {table} ({column_names}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')"
+
+
+def _copy_batch(pool, sql, text):
+    """Executa o COPY de um lote em uma thread do BatchWriter e retorna o tempo gasto."""
+    batch_start_time = time()
+    conn = pool.getconn()
+    try:
+        # O bloco with da conexão faz COMMIT (ou ROLLBACK, em caso de erro) do lote
+        with conn, conn.cursor() as cursor:
+            cursor.copy_expert(sql, io.BytesIO(text))
+    finally:
+        pool.putconn(conn)
+    return time() - batch_start_time
+
+
+class BatchWriter:
+    """
+    Grava os lotes gerados de um model e mostra o progresso de cada um.
+    
+    No PostgreSQL até COPY_CONCURRENCY lotes são gravados ao mesmo tempo, cada
+    um em uma sessão COPY própria (o psycopg2 libera o GIL durante o envio),
+    enquanto o chamador já monta os próximos. As sessões vêm de um pool de
+    COPY_CONCURRENCY conexões abertas uma única vez e reaproveitadas por todos
+    os lotes. Sem COPY (outros bancos ou
+    MASSIVO_USE_COPY=False) os lotes são gravados um a um por bulk_copy.
+    """
+    
+    def __init__(self, model, columns, table, total, label):
+        self.model = model
+        self.columns = columns
+        self.table = table
+        self.total = total
+        self.total_batches = (total + BATCH_SIZE - 1) // BATCH_SIZE
+        self.label = label
+        self.use_copy = connection.vendor == 'postgresql' and USE_COPY
+        self.executor = ThreadPoolExecutor(max_workers=COPY_CONCURRENCY) if self.use_copy else None
+        self.copy_sql = _copy_sql(model, columns, table) if self.use_copy else None
+        # Criado no primeiro lote, depois que o pool de processos da geração já
+        # foi iniciado (os processos não herdam as conexões)
+        self.pool = None
+        self.pending = deque()
+        self.start_time = time()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.executor is None:
+            return
+        try:
+            if exc_type is None:
+                while self.pending:
+                    self._collect()
+        finally:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            if self.pool is not None:
+                self.pool.closeall()
+    
+    def write(self, batch_num, batch_end, batch_size, rows):
+        """Grava um lote (tuplas ou, no PostgreSQL, o CSV já formatado para o COPY)."""
+        if not self.use_copy:
+            batch_start_time = time()
+            bulk_copy(self.model, rows, self.columns, self.table)
+            self._report(batch_num, batch_end, batch_size, time() - batch_start_time)
+            return
+        
+        if self.pool is None:
+            # Mesmos parâmetros de conexão do Django (settings.DATABASES)
+            self.pool = ThreadedConnectionPool(
+                COPY_CONCURRENCY, COPY_CONCURRENCY, **connection.get_connection_params()
+            )
+        
+        text = rows if isinstance(rows, bytes) else _copy_text(rows)
+        future = self.executor.submit(_copy_batch, self.pool, self.copy_sql, text)
+        self.pending.append((batch_num, batch_end, batch_size, future))
+        
+        # Limitar os lotes em memória aguardando gravação
+        while len(self.pending) > COPY_CONCURRENCY:
+            self._collect()
+    
+    def _collect(self):
+        """Aguarda o lote mais antigo em gravação (mantém o progresso em ordem)."""
+        batch_num, batch_end, batch_size, future = self.pending.popleft()
+        self._report(batch_num, batch_end, batch_size, future.result())
+    
+    def _report(self, batch_num, batch_end, batch_size, batch_time):
+        """Mostra o progresso após a gravação de um lote."""
+        progress = (batch_end / self.total) * 100
+        rows_per_sec = batch_size / batch_time if batch_time > 0 else 0
+        elapsed = time() - self.start_time
+        
+        print(f"[{batch_num+1}/{self.total_batches}] "
+              f"Progresso: {progress:6.2f}% | "
+              f"Inseridos: {batch_end:>7,}/{self.total:,} | "
+              f"Velocidade: {rows_per_sec:>8,.0f} {self.label}/s | "
+              f"Tempo: {elapsed:>6.1f}s")
+
+
+@contextmanager
+def staging_table(model):
+    """
+    Tabela de staging para a carga massiva de um model (apenas PostgreSQL).
+    
+    Os lotes são gravados com COPY em uma tabela UNLOGGED sem índices, chaves
+    nem WAL; ao final todas as linhas passam para a tabela real em um único
+    INSERT ... SELECT, os índices são atualizados de uma vez e as estatísticas
+    refeitas com ANALYZE. Fora do PostgreSQL retorna None (lotes vão direto
+    para a tabela do model).
+    """
+    if connection.vendor != 'postgresql':
+        yield None
+        return
+    
+    quote_name = connection.ops.quote_name
+    stage_name = f'{model._meta.db_table}_stage'
+    table = quote_name(model._meta.db_table)
+    stage = quote_name(stage_name)
+    
+    with connection.cursor() as cursor:
+        # Sobra de uma execução interrompida
+        cursor.execute(f"DROP TABLE IF EXISTS {stage}")
+        # LIKE sem INCLUDING INDEXES/CONSTRAINTS: apenas colunas e defaults
+        cursor.execute(f"CREATE UNLOGGED TABLE {stage} (LIKE {table} INCLUDING DEFAULTS)")
+    
+    try:
+        yield stage_name
+        
+        print(f"\nMovendo registros da tabela de staging para {model._meta.db_table}...")
+        move_start = time()
+        column_names = ', '.join(quote_name(field.column) for field in model._meta.concrete_fields)
+        with transaction.atomic(), connection.cursor() as cursor:
+            # O COMMIT não espera o flush do WAL: uma queda do servidor logo após
+            # a carga pode perdê-la inteira, o que é aceitável para dados de teste
+            cursor.execute("SET LOCAL synchronous_commit = off")
+            cursor.execute(f"INSERT INTO {table} ({column_names}) SELECT {column_names} FROM {stage}")
+            moved = cursor.rowcount
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {table}")
+        print(f"✓ {moved:,} registros movidos em {time() - move_start:.2f}s")
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {stage}")
+
+
 def get_or_create_students(num_students=100):
-    """Obtém alunos existentes ou cria novos se necessário."""
+    """
+    Obtém alunos existentes ou cria novos se necessário.
+    
+    Retorna apenas os ids dos alunos, em um array do NumPy: a geração só
+    precisa do student_id, sorteado por índice a cada lote.
+    """
     
     print(f"\n{'='*70}")
     print("VERIFICANDO ALUNOS NO BANCO DE DADOS")
     print(f"{'='*70}")
     
-    existing_students = list(Student.objects.filter(is_active=True))
+    active_ids = Student.objects.filter(is_active=True).values_list('id', flat=True)
+    existing_ids = list(active_ids[:num_students])
     
-    if len(existing_students) >= num_students:
-        print(f"✓ Encontrados {len(existing_students)} alunos ativos no banco.")
-        return existing_students[:num_students]
+    if len(existing_ids) >= num_students:
+        print(f"✓ Encontrados {len(existing_ids)} alunos ativos no banco.")
+        return np.array(existing_ids, dtype=object)
     
-    print(f"⚠ Apenas {len(existing_students)} alunos encontrados.")
-    print(f"  Criando {num_students - len(existing_students)} novos alunos...")
+    print(f"⚠ Apenas {len(existing_ids)} alunos encontrados.")
+    print(f"  Criando {num_students - len(existing_ids)} novos alunos...")
     
     # Criar novos alunos
     new_students = []
-    for i in range(len(existing_students), num_students):
+    for i in range(len(existing_ids), num_students):
         student = Student(
             registration_number=f'2023{str(i+1).zfill(4)}',
             name=f'Aluno {i+1}',
@@ -170,10 +524,10 @@ def get_or_create_students(num_students=100):
     Student.objects.bulk_create(new_students, batch_size=1000)
     print(f"✓ {len(new_students)} novos alunos criados com sucesso!")
     
-    return list(Student.objects.filter(is_active=True)[:num_students])
+    return np.array(list(active_ids[:num_students]), dtype=object)
 
 
-def get_or_create_exam_session(students):
+def get_or_create_exam_session(student_ids):
     """Obtém ou cria uma sessão de exame."""
     
     print(f"\n{'='*70}")
@@ -191,7 +545,7 @@ def get_or_create_exam_session(students):
             end_time=timezone.now() + timedelta(hours=2),
             status='active'
         )
-        exam_session.students.set(students)
+        exam_session.students.set(student_ids.tolist())
         print(f"✓ Sessão de exame criada: {exam_session.title}")
     else:
         print(f"✓ Sessão ativa encontrada: {exam_session.title}")
@@ -199,8 +553,84 @@ def get_or_create_exam_session(students):
     return exam_session
 
 
-def generate_monitoring_events(students, exam_session, total_events):
-    """Gera eventos de monitoramento em massa."""
+def _additional_data_text(batch_num, batch_size):
+    """
+    Textos JSON do additional_data de um lote, iguais ao orjson.dumps de cada dict.
+    
+    Só o índice muda entre as linhas: o restante é serializado uma vez por lote.
+    """
+    head = orjson.dumps({'batch': batch_num, 'index': 0})[:-2].decode('utf-8')  # {"batch":N,"index":
+    tail = orjson.dumps({'generated': True}).decode('utf-8').replace('{', ',', 1)  # ,"generated":true}
+    return [f'{head}{i}{tail}' for i in range(batch_size)]
+
+
+def _build_event_batch(rng, batch_num, batch_size, student_ids, exam_session_id, base_time, json_as_text=False):
+    """
+    Monta um lote de eventos como tuplas na ordem de EVENT_COLUMNS.
+    
+    Cada coluna é sorteada inteira pelo NumPy (uma chamada por coluna, não por
+    linha); o Python só junta as colunas em tuplas no final. Com json_as_text o
+    additional_data já vem serializado (para o COPY). Retorna também os bytes
+    dos ids e os índices (em student_ids) dos alunos de cada evento.
+    """
+    event_types = _choice(rng, EVENT_TYPES_ARR, batch_size)
+    is_url = event_types == 'url_access'
+    is_window = event_types == 'window_change'
+    is_app = (event_types == 'app_launch') | is_window
+    is_key = event_types == 'keyboard_event'
+    
+    # Timestamps aleatórios nas últimas 24 horas, já em texto ISO (UTC) para o COPY
+    base = np.datetime64(int(base_time.timestamp() * 1_000_000), 'us')
+    offsets = rng.integers(0, 24 * 3600, batch_size, endpoint=True).astype('timedelta64[s]')
+    timestamps = np.datetime_as_string(base + offsets, timezone='UTC')
+    
+    id_bytes = _uuid_bytes(batch_size)
+    student_idx = rng.integers(0, len(student_ids), batch_size, dtype=np.int32)
+    
+    columns = (
+        _uuid_hex(id_bytes),
+        student_ids[student_idx].tolist(),
+        np.where(rng.random(batch_size) > 0.3, exam_session_id, None).tolist(),
+        event_types.tolist(),
+        timestamps.tolist(),
+        np.where(is_url, _choice(rng, URLS_ARR, batch_size), '').tolist(),
+        np.where(is_url, _choice(rng, BROWSERS_ARR, batch_size), '').tolist(),
+        np.where(is_app, _choice(rng, APPS_ARR, batch_size), '').tolist(),
+        np.where(is_window, _choice(rng, WINDOW_TITLES_ARR, batch_size), '').tolist(),
+        np.where(is_key, _choice(rng, KEY_EVENTS_ARR, batch_size), '').tolist(),
+        _choice(rng, MACHINE_NAMES_ARR, batch_size).tolist(),
+        _choice(rng, IP_ADDRESSES_ARR, batch_size).tolist(),
+        (_additional_data_text(batch_num, batch_size) if json_as_text else
+         [{'batch': batch_num, 'index': i, 'generated': True} for i in range(batch_size)]),
+    )
+    return list(zip(*columns)), id_bytes, student_idx
+
+
+def _event_batch_job(seed, batch_num, batch_size, student_ids, exam_session_id, base_time, as_copy_text):
+    """
+    Gera um lote de eventos em um processo do pool.
+    
+    Retorna o lote (já como CSV do COPY, quando as_copy_text, para não
+    serializar milhares de tuplas entre processos), os bytes dos ids e os
+    índices dos alunos, usados na geração dos alertas.
+    """
+    rng = np.random.default_rng(seed)
+    with gc_paused():
+        rows, id_bytes, student_idx = _build_event_batch(
+            rng, batch_num, batch_size, student_ids, exam_session_id, base_time, as_copy_text
+        )
+        return (_copy_text(rows) if as_copy_text else rows), id_bytes, student_idx
+
+
+def generate_monitoring_events(student_ids, exam_session, total_events, table=None):
+    """
+    Gera eventos de monitoramento em massa (em table, se informada).
+    
+    Retorna (event_ids, event_student_idx): os ids dos eventos como matriz de
+    bytes (n x 16) e o índice em student_ids do aluno de cada evento. Arrays
+    compactos no lugar de 500 mil objetos Python, que é tudo de que os
+    alertas precisam.
+    """
     
     print(f"\n{'='*70}")
     print(f"GERANDO {total_events:,} EVENTOS DE MONITORAMENTO")
@@ -214,59 +644,44 @@ def generate_monitoring_events(students, exam_session, total_events):
     # Data base para os eventos (últimas 24 horas)
     base_time = timezone.now() - timedelta(hours=24)
     
-    created_events = []
+    # Uma semente independente por lote: os processos do pool não repetem sorteios
+    seeds = SEED_SEQUENCE.spawn(total_batches)
+    
+    event_ids = np.empty((total_events, 16), dtype=np.uint8)
+    event_student_idx = np.empty(total_events, dtype=np.int32)
+    
+    # Os processos do pool não usam o banco: fechar a conexão antes de criá-los
+    # evita que herdem o socket aberto (o Django reconecta no próximo uso)
+    connection.close()
     
-    for batch_num in range(total_batches):
-        batch_start = batch_num * BATCH_SIZE
-        batch_end = min(batch_start + BATCH_SIZE, total_events)
-        batch_size = batch_end - batch_start
+    with ProcessPoolExecutor(max_workers=GENERATION_WORKERS) as executor, \
+            BatchWriter(MonitoringEvent, EVENT_COLUMNS, table, total_events, 'eventos') as writer:
+        # Os processos geram os próximos lotes enquanto os atuais são gravados;
+        # no máximo 2 lotes por processo aguardando, para limitar a memória
+        pending = deque()
+        next_batch = 0
         
-        events = []
-        for i in range(batch_size):
-            event_type = random.choice(EVENT_TYPES)
-            student = random.choice(students)
+        for batch_num in range(total_batches):
+            while next_batch < total_batches and len(pending) < 2 * GENERATION_WORKERS:
+                next_start = next_batch * BATCH_SIZE
+                pending.append(executor.submit(
+                    _event_batch_job, seeds[next_batch], next_batch,
+                    min(BATCH_SIZE, total_events - next_start),
+                    student_ids, exam_session.id, base_time, writer.use_copy
+                ))
+                next_batch += 1
             
-            # Timestamp aleatório nas últimas 24 horas
-            random_seconds = random.randint(0, 24 * 3600)
-            timestamp = base_time + timedelta(seconds=random_seconds)
+            batch_start = batch_num * BATCH_SIZE
+            batch_end = min(batch_start + BATCH_SIZE, total_events)
+            batch_size = batch_end - batch_start
             
-            event = MonitoringEvent(
-                id=uuid.uuid4(),
-                student=student,
-                exam_session=exam_session if random.random() > 0.3 else None,
-                event_type=event_type,
-                url=random.choice(URLS) if event_type == 'url_access' else '',
-                browser=random.choice(BROWSERS) if event_type == 'url_access' else '',
-                app_name=random.choice(APPS) if event_type in ['app_launch', 'window_change'] else '',
-                window_title=random.choice(WINDOW_TITLES) if event_type == 'window_change' else '',
-                key_event=random.choice(KEY_EVENTS) if event_type == 'keyboard_event' else '',
-                machine_name=random.choice(MACHINE_NAMES),
-                ip_address=random.choice(IP_ADDRESSES),
-                additional_data={
-                    'batch': batch_num,
-                    'index': i,
-                    'generated': True
-                }
-            )
-            events.append(event)
-        
-        # Inserir lote no banco
-        batch_start_time = time()
-        created = MonitoringEvent.objects.bulk_create(events, batch_size=BATCH_SIZE)
-        batch_time = time() - batch_start_time
-        
-        created_events.extend(created)
-        
-        # Mostrar progresso
-        progress = (batch_end / total_events) * 100
-        events_per_sec = batch_size / batch_time if batch_time > 0 else 0
-        elapsed = time() - start_time
-        
-        print(f"[{batch_num+1}/{total_batches}] "
-              f"Progresso: {progress:6.2f}% | "
-              f"Inseridos: {batch_end:>7,}/{total_events:,} | "
-              f"Velocidade: {events_per_sec:>8,.0f} eventos/s | "
-              f"Tempo: {elapsed:>6.1f}s")
+            events, id_bytes, student_idx = pending.popleft().result()
+            
+            # Inserir lote no banco
+            writer.write(batch_num, batch_end, batch_size, events)
+            
+            event_ids[batch_start:batch_end] = id_bytes
+            event_student_idx[batch_start:batch_end] = student_idx
     
     total_time = time() - start_time
     avg_speed = total_events / total_time if total_time > 0 else 0
@@ -276,11 +691,46 @@ def generate_monitoring_events(students, exam_session, total_events):
     print(f"  Tempo total: {total_time:.2f}s")
     print(f"  Velocidade média: {avg_speed:,.0f} eventos/s")
     
-    return created_events
+    return event_ids, event_student_idx
+
+
+def _build_alert_batch(rng, batch_start, batch_size, event_ids, event_student_idx, student_ids, now):
+    """
+    Monta um lote de alertas como tuplas na ordem de ALERT_COLUMNS.
+    
+    Assim como nos eventos, cada coluna é sorteada de uma vez pelo NumPy,
+    inclusive as escolhas ponderadas de severidade e status.
+    """
+    # Eventos em sequência (com possível reuso)
+    indices = (batch_start + np.arange(batch_size)) % len(event_ids)
+    event_student_ids = student_ids[event_student_idx[indices]]
+    
+    # 70% dos alertas são relacionados ao aluno do evento
+    random_student_ids = student_ids[rng.integers(0, len(student_ids), batch_size)]
+    alert_student_ids = np.where(rng.random(batch_size) > 0.3, event_student_ids, random_student_ids)
+    
+    severities = rng.choice(ALERT_SEVERITIES_ARR, size=batch_size, p=ALERT_SEVERITY_WEIGHTS)
+    statuses = rng.choice(ALERT_STATUSES_ARR, size=batch_size, p=ALERT_STATUS_WEIGHTS)
+    
+    columns = (
+        _uuid_hex(_uuid_bytes(batch_size)),
+        _uuid_hex(event_ids[indices]),
+        alert_student_ids.tolist(),
+        severities.tolist(),
+        statuses.tolist(),
+        _choice(rng, ALERT_TITLES_ARR, batch_size).tolist(),
+        _choice(rng, ALERT_DESCRIPTIONS_ARR, batch_size).tolist(),
+        _choice(rng, ALERT_REASONS_ARR, batch_size).tolist(),
+        [now] * batch_size,
+        [now] * batch_size,
+        np.where(statuses == 'resolved', now, None).tolist(),
+        np.where(rng.random(batch_size) > 0.2, '', 'Verificado automaticamente').tolist(),
+    )
+    return list(zip(*columns))
 
 
-def generate_alerts(events, students, total_alerts):
-    """Gera alertas em massa baseados nos eventos."""
+def generate_alerts(events, student_ids, total_alerts, table=None):
+    """Gera alertas em massa baseados nos eventos (em table, se informada)."""
     
     print(f"\n{'='*70}")
     print(f"GERANDO {total_alerts:,} ALERTAS")
@@ -288,63 +738,35 @@ def generate_alerts(events, students, total_alerts):
     print(f"Batch size: {BATCH_SIZE:,} registros por lote")
     print()
     
-    if len(events) < total_alerts:
-        print(f"⚠ Aviso: Apenas {len(events)} eventos disponíveis para {total_alerts:,} alertas.")
+    event_ids, event_student_idx = events
+    if len(event_ids) < total_alerts:
+        print(f"⚠ Aviso: Apenas {len(event_ids)} eventos disponíveis para {total_alerts:,} alertas.")
         print(f"  Alertas serão criados reutilizando eventos.")
     
     start_time = time()
     total_batches = (total_alerts + BATCH_SIZE - 1) // BATCH_SIZE
+    seeds = SEED_SEQUENCE.spawn(total_batches)
     
-    for batch_num in range(total_batches):
-        batch_start = batch_num * BATCH_SIZE
-        batch_end = min(batch_start + BATCH_SIZE, total_alerts)
-        batch_size = batch_end - batch_start
-        
-        alerts = []
-        for i in range(batch_size):
-            # Selecionar evento (com possível reuso)
-            event = events[(batch_start + i) % len(events)]
+    with BatchWriter(Alert, ALERT_COLUMNS, table, total_alerts, 'alertas') as writer:
+        for batch_num in range(total_batches):
+            batch_start = batch_num * BATCH_SIZE
+            batch_end = min(batch_start + BATCH_SIZE, total_alerts)
+            batch_size = batch_end - batch_start
             
-            # 70% dos alertas são relacionados ao aluno do evento
-            student = event.student if random.random() > 0.3 else random.choice(students)
+            # created_at/updated_at/resolved_at: um único horário para o lote inteiro
+            # (o COPY não passa pelo auto_now do ORM)
+            now = timezone.now()
             
-            # Peso maior para severidades médias
-            severity_weights = [0.2, 0.4, 0.3, 0.1]  # low, medium, high, critical
-            severity = random.choices(ALERT_SEVERITIES, weights=severity_weights)[0]
+            # Gerador próprio do lote: independe da ordem de geração dos demais
+            rng = np.random.default_rng(seeds[batch_num])
             
-            # Peso maior para alertas novos
-            status_weights = [0.6, 0.2, 0.15, 0.05]  # new, reviewing, resolved, false_positive
-            status = random.choices(ALERT_STATUSES, weights=status_weights)[0]
+            with gc_paused():
+                alerts = _build_alert_batch(
+                    rng, batch_start, batch_size, event_ids, event_student_idx, student_ids, now
+                )
             
-            alert = Alert(
-                id=uuid.uuid4(),
-                event=event,
-                student=student,
-                severity=severity,
-                status=status,
-                title=random.choice(ALERT_TITLES),
-                description=random.choice(ALERT_DESCRIPTIONS),
-                reason=random.choice(ALERT_REASONS),
-                admin_notes='' if random.random() > 0.2 else 'Verificado automaticamente',
-                resolved_at=timezone.now() if status == 'resolved' else None
-            )
-            alerts.append(alert)
-        
-        # Inserir lote no banco
-        batch_start_time = time()
-        Alert.objects.bulk_create(alerts, batch_size=BATCH_SIZE)
-        batch_time = time() - batch_start_time
-        
-        # Mostrar progresso
-        progress = (batch_end / total_alerts) * 100
-        alerts_per_sec = batch_size / batch_time if batch_time > 0 else 0
-        elapsed = time() - start_time
-        
-        print(f"[{batch_num+1}/{total_batches}] "
-              f"Progresso: {progress:6.2f}% | "
-              f"Inseridos: {batch_end:>7,}/{total_alerts:,} | "
-              f"Velocidade: {alerts_per_sec:>8,.0f} alertas/s | "
-              f"Tempo: {elapsed:>6.1f}s")
+            # Inserir lote no banco
+            writer.write(batch_num, batch_end, batch_size, alerts)
     
     total_time = time() - start_time
     avg_speed = total_alerts / total_time if total_time > 0 else 0
@@ -355,6 +777,13 @@ def generate_alerts(events, students, total_alerts):
     print(f"  Velocidade média: {avg_speed:,.0f} alertas/s")
 
 
+def _count_by(model, field):
+    """Conta os registros do model por valor de field (dict valor -> total)."""
+    return dict(
+        model.objects.order_by().values_list(field).annotate(total=Count('pk'))
+    )
+
+
 def show_statistics():
     """Mostra estatísticas do banco de dados."""
     
@@ -374,22 +803,26 @@ def show_statistics():
     print(f"  • Alertas: {total_alerts:,}")
     
     if total_events > 0:
+        # Uma consulta agrupada por tabela e coluna, em vez de um COUNT por valor
+        event_counts = _count_by(MonitoringEvent, 'event_type')
         print(f"\n📈 Eventos por tipo:")
         for event_type, label in MonitoringEvent.EVENT_TYPES:
-            count = MonitoringEvent.objects.filter(event_type=event_type).count()
+            count = event_counts.get(event_type, 0)
             percentage = (count / total_events) * 100
             print(f"  • {label}: {count:,} ({percentage:.1f}%)")
     
     if total_alerts > 0:
+        severity_counts = _count_by(Alert, 'severity')
+        status_counts = _count_by(Alert, 'status')
         print(f"\n🚨 Alertas por severidade:")
         for severity, label in Alert.SEVERITY_LEVELS:
-            count = Alert.objects.filter(severity=severity).count()
+            count = severity_counts.get(severity, 0)
             percentage = (count / total_alerts) * 100
             print(f"  • {label}: {count:,} ({percentage:.1f}%)")
         
         print(f"\n📋 Alertas por status:")
         for status, label in Alert.STATUS_CHOICES:
-            count = Alert.objects.filter(status=status).count()
+            count = status_counts.get(status, 0)
             percentage = (count / total_alerts) * 100
             print(f"  • {label}: {count:,} ({percentage:.1f}%)")
 
@@ -407,16 +840,18 @@ def main():
     
     try:
         # 1. Verificar/criar alunos
-        students = get_or_create_students(num_students=100)
+        student_ids = get_or_create_students(num_students=100)
         
         # 2. Verificar/criar sessão de exame
-        exam_session = get_or_create_exam_session(students)
+        exam_session = get_or_create_exam_session(student_ids)
         
         # 3. Gerar eventos de monitoramento
-        events = generate_monitoring_events(students, exam_session, TOTAL_EVENTS)
+        with staging_table(MonitoringEvent) as table:
+            events = generate_monitoring_events(student_ids, exam_session, TOTAL_EVENTS, table)
         
-        # 4. Gerar alertas
-        generate_alerts(events, students, TOTAL_ALERTS)
+        # 4. Gerar alertas (os eventos já estão na tabela real, para a FK)
+        with staging_table(Alert) as table:
+            generate_alerts(events, student_ids, TOTAL_ALERTS, table)
         
         # 5. Mostrar estatísticas
         show_statistics()
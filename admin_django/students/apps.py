@@ -5,4 +5,7 @@ class StudentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'students'
     verbose_name = 'Gestão de Alunos'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
 
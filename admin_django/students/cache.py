@@ -0,0 +1,34 @@
+"""
+Cache de alunos por matrícula, usado na ingestão da API do script e nos consumers WebSocket.
+"""
+from django.core.cache import cache
+
+from .models import Student
+
+
+# Tempo (segundos) em que um aluno buscado pela matrícula é reaproveitado entre requisições
+STUDENT_CACHE_TIMEOUT = 60
+
+
+def student_cache_key(registration_number):
+    """Chave de cache do aluno com a matrícula informada."""
+    return f'student:{registration_number}'
+
+
+def get_student_by_registration(registration_number):
+    """
+    Retorna o aluno (ativo ou não) com a matrícula informada, ou None.
+    
+    O aluno fica em cache por alguns segundos; alterações em Student invalidam
+    a entrada (students/signals.py). Matrículas inexistentes não são guardadas,
+    para que um aluno recém-cadastrado seja encontrado na requisição seguinte.
+    """
+    key = student_cache_key(registration_number)
+    student = cache.get(key)
+    if student is None:
+        student = Student.objects.only(
+            'id', 'registration_number', 'name', 'is_active'
+        ).filter(registration_number=registration_number).first()
+        if student is not None:
+            cache.set(key, student, STUDENT_CACHE_TIMEOUT)
+    return student
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:21
+
+from django.db import migrations, models
+import students.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0002_studentheartbeat'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='student',
+            name='api_key',
+            field=models.CharField(default=students.models.generate_api_key, editable=False, max_length=100, unique=True, verbose_name='Chave API'),
+        ),
+    ]
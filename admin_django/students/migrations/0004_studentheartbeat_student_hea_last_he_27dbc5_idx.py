@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0003_student_api_key_default'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentheartbeat',
+            index=models.Index(fields=['-last_heartbeat'], name='student_hea_last_he_27dbc5_idx'),
+        ),
+    ]
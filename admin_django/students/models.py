@@ -6,6 +6,11 @@ from django.core.validators import EmailValidator
 import uuid
 
 
+def generate_api_key():
+    """Gera uma nova chave API para o aluno."""
+    return uuid.uuid4().hex
+
+
 class Student(models.Model):
     """Modelo para representar um aluno monitorado."""
     
@@ -18,7 +23,7 @@ class Student(models.Model):
     is_active = models.BooleanField('Ativo', default=True)
     
     # Chave secreta para autenticação do script
-    api_key = models.CharField('Chave API', max_length=100, unique=True, editable=False)
+    api_key = models.CharField('Chave API', max_length=100, unique=True, editable=False, default=generate_api_key)
     
     class Meta:
         db_table = 'students'
@@ -28,11 +33,6 @@ class Student(models.Model):
     
     def __str__(self):
         return f"{self.registration_number} - {self.name}"
-    
-    def save(self, *args, **kwargs):
-        if not self.api_key:
-            self.api_key = uuid.uuid4().hex
-        super().save(*args, **kwargs)
 
 
 class StudentHeartbeat(models.Model):
@@ -53,6 +53,9 @@ class StudentHeartbeat(models.Model):
         verbose_name = 'Heartbeat do Aluno'
         verbose_name_plural = 'Heartbeats dos Alunos'
         ordering = ['-last_heartbeat']
+        indexes = [
+            models.Index(fields=['-last_heartbeat']),
+        ]
     
     def __str__(self):
         return f"{self.student.name} - {self.last_heartbeat.strftime('%d/%m/%Y %H:%M:%S')}"
@@ -0,0 +1,34 @@
+"""
+Signals de alunos.
+"""
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .cache import student_cache_key
+from .models import Student
+
+
+@receiver(post_init, sender=Student)
+def remember_registration_number(sender, instance, **kwargs):
+    """
+    Guarda na instância a matrícula com que ela foi carregada.
+    
+    Se a matrícula mudar, a entrada de cache da matrícula antiga também
+    precisa ser removida (invalidate_student_cache). Lida de __dict__ para
+    não disparar a consulta de um campo adiado (.only()/.defer()).
+    """
+    instance._previous_registration_number = instance.__dict__.get('registration_number')
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_student_cache(sender, instance, **kwargs):
+    """Remove o aluno alterado ou removido do cache por matrícula (atual e anterior)."""
+    registration_numbers = {instance.registration_number}
+    previous = getattr(instance, '_previous_registration_number', None)
+    if previous:
+        registration_numbers.add(previous)
+    cache.delete_many([student_cache_key(number) for number in registration_numbers])
+    # Próximas alterações desta instância partem da matrícula gravada agora
+    instance._previous_registration_number = instance.registration_number
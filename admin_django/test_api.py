@@ -1,108 +1,133 @@
 """
 Script para testar a API do sistema.
 Útil para verificar se tudo está funcionando corretamente.
+
+Com o servidor rodando, execute o script diretamente (resumo interativo) ou
+pelo pytest, com os testes distribuídos entre processos:
+    pytest -n 4 test_api.py
 """
+import os
 import requests
-import json
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Configurações
 BASE_URL = 'http://localhost:8000'
 REGISTRATION_NUMBER = '202301'  # Substitua pela matrícula de um aluno cadastrado
+HEARTBEAT_URL = f'{BASE_URL}/api/heartbeat/'
+REPORT_URL = f'{BASE_URL}/api/report/'
 
-def test_heartbeat():
-    """Testa o endpoint de heartbeat."""
-    print("\n" + "="*60)
-    print("Testando Heartbeat...")
-    print("="*60)
+# Sessão única para todos os envios: reaproveita as conexões (keep-alive)
+SESSION = requests.Session()
+SESSION.headers.update({'Content-Type': 'application/json'})
+# Sem proxies nem .netrc do ambiente: o requests não os procura a cada envio
+SESSION.trust_env = False
+# Falhas ao conectar (servidor ainda subindo) são repetidas com espera crescente;
+# requisições que chegaram ao servidor não são reenviadas, para não duplicar eventos
+RETRY = Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.2)
+SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=RETRY))
+
+# TEST_VERBOSE=1 mostra as respostas indentadas; sem ele, em uma única linha
+VERBOSE = os.getenv('TEST_VERBOSE') == '1'
+
+# Partes fixas dos eventos enviados: a cada teste só o additional_data (timestamp) é montado
+URL_ACCESS_TPL = {
+    'registration_number': REGISTRATION_NUMBER,
+    'event_type': 'url_access',
+    'url': 'https://www.google.com/search?q=test',
+    'browser': 'Google Chrome',
+    'machine_name': 'PC-TESTE-API',
+}
+APP_LAUNCH_TPL = {
+    'registration_number': REGISTRATION_NUMBER,
+    'event_type': 'app_launch',
+    'app_name': 'WhatsApp.exe',
+    'machine_name': 'PC-TESTE-API',
+}
+
+
+def dump(obj):
+    """Formata uma resposta JSON para a saída do teste."""
+    if VERBOSE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return orjson.dumps(obj).decode('utf-8')
+
+
+def _run_test(title, url, data, expected_status):
+    """
+    Envia data para url e verifica (assert) o status da resposta.
     
-    url = f"{BASE_URL}/api/heartbeat/"
-    data = {'registration_number': REGISTRATION_NUMBER}
+    A saída do teste é mostrada de uma vez ao final, para não se misturar com
+    a dos demais testes, que rodam ao mesmo tempo (main ou pytest -n).
+    """
+    lines = ["\n" + "="*60, title, "="*60]
     
     try:
-        response = requests.post(url, json=data)
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-        return response.status_code == 200
+        # Corpo serializado pelo orjson (o Content-Type já vem da SESSION)
+        response = SESSION.post(url, data=orjson.dumps(data))
+        lines.append(f"Status Code: {response.status_code}")
+        lines.append(f"Response: {dump(response.json())}")
+        assert response.status_code == expected_status, \
+            f"status {response.status_code}, esperado {expected_status}"
     except Exception as e:
-        print(f"Erro: {e}")
+        lines.append(f"Erro: {e}")
+        raise
+    finally:
+        print("\n".join(lines))
+
+
+def _passed(test):
+    """Executa um teste e retorna se ele passou (resumo do main)."""
+    try:
+        test()
+        return True
+    except Exception:
+        # O erro já foi mostrado na saída do teste
         return False
 
 
+def test_heartbeat():
+    """Testa o endpoint de heartbeat."""
+    data = {'registration_number': REGISTRATION_NUMBER}
+    
+    _run_test("Testando Heartbeat...", HEARTBEAT_URL, data, 200)
+
+
 def test_report_url_access():
     """Testa o envio de um evento de acesso a URL."""
-    print("\n" + "="*60)
-    print("Testando Report - Acesso a URL...")
-    print("="*60)
-    
-    url = f"{BASE_URL}/api/report/"
     data = {
-        'registration_number': REGISTRATION_NUMBER,
-        'event_type': 'url_access',
-        'url': 'https://www.google.com/search?q=test',
-        'browser': 'Google Chrome',
-        'machine_name': 'PC-TESTE-API',
+        **URL_ACCESS_TPL,
         'additional_data': {
             'test': True,
             'timestamp': datetime.now().isoformat()
         }
     }
     
-    try:
-        response = requests.post(url, json=data)
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-        return response.status_code == 201
-    except Exception as e:
-        print(f"Erro: {e}")
-        return False
+    _run_test("Testando Report - Acesso a URL...", REPORT_URL, data, 201)
 
 
 def test_report_app_launch():
     """Testa o envio de um evento de abertura de aplicativo."""
-    print("\n" + "="*60)
-    print("Testando Report - Abertura de Aplicativo...")
-    print("="*60)
-    
-    url = f"{BASE_URL}/api/report/"
     data = {
-        'registration_number': REGISTRATION_NUMBER,
-        'event_type': 'app_launch',
-        'app_name': 'WhatsApp.exe',
-        'machine_name': 'PC-TESTE-API',
+        **APP_LAUNCH_TPL,
         'additional_data': {
             'test': True,
             'timestamp': datetime.now().isoformat()
         }
     }
     
-    try:
-        response = requests.post(url, json=data)
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-        return response.status_code == 201
-    except Exception as e:
-        print(f"Erro: {e}")
-        return False
+    _run_test("Testando Report - Abertura de Aplicativo...", REPORT_URL, data, 201)
 
 
 def test_invalid_registration():
     """Testa com matrícula inválida."""
-    print("\n" + "="*60)
-    print("Testando Matrícula Inválida (deve falhar)...")
-    print("="*60)
-    
-    url = f"{BASE_URL}/api/heartbeat/"
     data = {'registration_number': '999999'}
     
-    try:
-        response = requests.post(url, json=data)
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-        return response.status_code == 401
-    except Exception as e:
-        print(f"Erro: {e}")
-        return False
+    # A API responde 404 (aluno não encontrado) para matrícula desconhecida
+    _run_test("Testando Matrícula Inválida (deve falhar)...", HEARTBEAT_URL, data, 404)
 
 
 def main():
@@ -119,13 +144,18 @@ def main():
     
     input("\nPressione Enter para continuar...")
     
-    results = {
-        'Heartbeat': test_heartbeat(),
-        'Report URL Access': test_report_url_access(),
-        'Report App Launch': test_report_app_launch(),
-        'Invalid Registration': test_invalid_registration(),
+    tests = {
+        'Heartbeat': test_heartbeat,
+        'Report URL Access': test_report_url_access,
+        'Report App Launch': test_report_app_launch,
+        'Invalid Registration': test_invalid_registration,
     }
     
+    # Os testes são independentes: rodam ao mesmo tempo, compartilhando a SESSION
+    with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+        futures = {name: executor.submit(_passed, test) for name, test in tests.items()}
+        results = {name: future.result() for name, future in futures.items()}
+    
     # Resumo
     print("\n" + "="*60)
     print("  RESUMO DOS TESTES")
@@ -2,13 +2,30 @@
 Script de teste para verificar eventos de teclado.
 Simula o envio de eventos de teclado do script do aluno para o servidor.
 """
+import os
 import requests
-import json
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 
 # Configuração
 BASE_URL = 'http://localhost:8000'
-REPORT_URL = f'{BASE_URL}/api/report/'
+HEARTBEAT_URL = f'{BASE_URL}/api/heartbeat/'
+REPORT_BULK_URL = f'{BASE_URL}/api/report/bulk/'
+
+# Sessão única para todos os envios: reaproveita as conexões (keep-alive)
+SESSION = requests.Session()
+SESSION.headers.update({'Content-Type': 'application/json'})
+# Sem proxies nem .netrc do ambiente: o requests não os procura a cada envio
+SESSION.trust_env = False
+# Falhas ao conectar (servidor ainda subindo) são repetidas com espera crescente;
+# requisições que chegaram ao servidor não são reenviadas, para não duplicar eventos
+RETRY = Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.2)
+SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=RETRY))
+
+# TEST_VERBOSE=1 mostra as respostas indentadas; sem ele, em uma única linha
+VERBOSE = os.getenv('TEST_VERBOSE') == '1'
 
 # Dados do aluno de teste
 STUDENT_DATA = {
@@ -52,10 +69,17 @@ KEYBOARD_EVENTS = [
 ]
 
 
-def enviar_evento_teclado(key_event_data):
-    """Envia um evento de teclado para o servidor."""
+def dump(obj):
+    """Formata uma resposta JSON para a saída do teste."""
+    if VERBOSE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return orjson.dumps(obj).decode('utf-8')
+
+
+def montar_payload(key_event_data):
+    """Monta a parte fixa do evento no formato enviado pelo script do aluno (sem timestamp)."""
     
-    payload = {
+    return {
         'registration_number': STUDENT_DATA['registration_number'],
         'event_type': key_event_data['event_type'],
         'key_event': key_event_data['key_event'],
@@ -63,30 +87,51 @@ def enviar_evento_teclado(key_event_data):
         'additional_data': {
             'description': key_event_data['description'],
             'key': key_event_data['key'],
-            'timestamp': datetime.now().isoformat()
         }
     }
+
+
+# Payloads montados uma única vez; a cada envio só o timestamp é acrescentado
+KEYBOARD_PAYLOADS = [montar_payload(evento) for evento in KEYBOARD_EVENTS]
+
+
+def com_timestamp(payload, timestamp):
+    """Cópia rasa do payload com o timestamp do envio em additional_data."""
+    
+    return {
+        **payload,
+        'additional_data': {**payload['additional_data'], 'timestamp': timestamp}
+    }
+
+
+def enviar_eventos_teclado(eventos, payloads, timestamp):
+    """
+    Envia os eventos de teclado (já montados em payloads) em uma única requisição.
+    
+    Os eventos do lote são enviados juntos e levam o mesmo timestamp. O
+    endpoint de lote grava todos os eventos ou nenhum, então o resultado vale
+    para o lote inteiro.
+    """
+    
+    for i, evento in enumerate(eventos, 1):
+        print(f"\n[{i}/{len(eventos)}] {evento['key_event']}")
+        print(f"Descrição: {evento['description']}")
     
     try:
-        print(f"\n{'='*60}")
-        print(f"Enviando evento: {key_event_data['key_event']}")
-        print(f"Descrição: {key_event_data['description']}")
-        print(f"{'='*60}")
-        
-        response = requests.post(
-            REPORT_URL,
-            json=payload,
-            headers={'Content-Type': 'application/json'}
+        # Corpo serializado pelo orjson (o Content-Type já vem da SESSION)
+        response = SESSION.post(
+            REPORT_BULK_URL,
+            data=orjson.dumps({'events': [com_timestamp(payload, timestamp) for payload in payloads]})
         )
         
         print(f"\nStatus Code: {response.status_code}")
-        print(f"Resposta: {json.dumps(response.json(), indent=2, ensure_ascii=False)}")
+        print(f"Resposta: {dump(response.json())}")
         
         if response.status_code == 201:
-            print("✅ Evento enviado com SUCESSO!")
+            print("✅ Eventos enviados com SUCESSO!")
             return True
         else:
-            print("❌ Erro ao enviar evento")
+            print("❌ Erro ao enviar eventos")
             return False
             
     except requests.exceptions.ConnectionError:
@@ -105,13 +150,10 @@ def verificar_aluno():
     print("VERIFICANDO ALUNO DE TESTE")
     print("="*60)
     
-    heartbeat_url = f'{BASE_URL}/api/heartbeat/'
-    
     try:
-        response = requests.post(
-            heartbeat_url,
-            json=STUDENT_DATA,
-            headers={'Content-Type': 'application/json'}
+        response = SESSION.post(
+            HEARTBEAT_URL,
+            json=STUDENT_DATA
         )
         
         if response.status_code in [200, 201]:
@@ -161,17 +203,12 @@ def main():
     sucessos = 0
     falhas = 0
     
-    for i, evento in enumerate(KEYBOARD_EVENTS, 1):
-        print(f"\n[{i}/{len(KEYBOARD_EVENTS)}]")
-        
-        if enviar_evento_teclado(evento):
-            sucessos += 1
-        else:
-            falhas += 1
-        
-        # Pequena pausa entre envios
-        import time
-        time.sleep(1)
+    # Todos os eventos em uma única requisição ao endpoint de lote
+    timestamp = datetime.now().isoformat()
+    if enviar_eventos_teclado(KEYBOARD_EVENTS, KEYBOARD_PAYLOADS, timestamp):
+        sucessos = len(KEYBOARD_EVENTS)
+    else:
+        falhas = len(KEYBOARD_EVENTS)
     
     # Resumo
     print("\n" + "="*60)
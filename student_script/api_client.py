@@ -5,15 +5,21 @@ import logging
 import socket
 import requests
 import json
+import struct
 import threading
 import time
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import websocket
 
-from config import REPORT_ENDPOINT, ALERT_ENDPOINT, HEARTBEAT_ENDPOINT, SERVER_URL
+from config import REPORT_ENDPOINT, REPORT_BULK_ENDPOINT, ALERT_ENDPOINT, HEARTBEAT_ENDPOINT, SERVER_URL
 
 logger = logging.getLogger(__name__)
 
+# Cabeçalho dos frames binários de webcam (mesmo formato de admin_django/dashboard/consumers.py):
+# tamanho da matrícula, tamanho do nome, tamanho do JSON de detecções, tamanho do JPEG,
+# timestamp, número do frame, largura, altura, has_face, no_face_duration
+WEBCAM_FRAME_HEADER = struct.Struct('<IIIIdIHH?f')
+
 
 class APIClient:
     """Cliente para interagir com a API do servidor."""
@@ -136,6 +142,45 @@ class APIClient:
             logger.error(f"Erro ao reportar evento: {e}")
             return False
     
+    def report_events(self, events: List[Dict]) -> bool:
+        """
+        Reporta vários eventos para o servidor em uma única requisição.
+        
+        Args:
+            events: Lista de dicionários com dados dos eventos (máximo de 500)
+            
+        Returns:
+            True se enviados com sucesso, False caso contrário
+        """
+        if not events:
+            return True
+        
+        try:
+            # Adicionar matrícula aos dados (em cópias, sem alterar os dicionários recebidos)
+            payload = [
+                {**event_data, 'registration_number': self.registration_number}
+                for event_data in events
+            ]
+            
+            response = self.session.post(
+                REPORT_BULK_ENDPOINT,
+                json={'events': payload},
+                timeout=10
+            )
+            
+            if response.status_code == 201:
+                logger.debug(f"{len(events)} eventos reportados")
+                return True
+            else:
+                logger.warning(
+                    f"Falha ao reportar eventos: {response.status_code} - {response.text}"
+                )
+                return False
+                
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Erro ao reportar eventos: {e}")
+            return False
+    
     def send_alert(self, alert_data: Dict) -> bool:
         """
         Envia um alerta para o servidor.
@@ -261,8 +306,11 @@ class APIClient:
         """
         Envia um frame de webcam via WebSocket.
         
+        O frame é enviado como mensagem binária: WEBCAM_FRAME_HEADER seguido
+        da matrícula, do nome do aluno, das detecções em JSON e dos bytes JPEG.
+        
         Args:
-            frame_data: Dicionário com dados do frame
+            frame_data: Dicionário com dados do frame ('frame' com os bytes JPEG)
             
         Returns:
             True se enviado com sucesso, False caso contrário
@@ -271,18 +319,31 @@ class APIClient:
             if not self.ws_connected or not self.ws:
                 return False
             
-            # Adicionar informações do aluno
-            message = {
-                'type': 'webcam_frame',
-                'registration_number': self.registration_number,
-                'student_name': self.student_name,
-                'machine_name': self.machine_name,
-                'data': frame_data
-            }
+            registration = self.registration_number.encode('utf-8')
+            name = (self.student_name or '').encode('utf-8')
+            # Sem detecções a seção fica vazia (o viewer interpreta tamanho 0 como [])
+            detections = frame_data.get('detections')
+            detections = json.dumps(detections).encode('utf-8') if detections else b''
+            image = frame_data['frame']
+            
+            header = WEBCAM_FRAME_HEADER.pack(
+                len(registration),
+                len(name),
+                len(detections),
+                len(image),
+                frame_data.get('timestamp', 0.0),
+                frame_data.get('frame_number', 0),
+                frame_data.get('width', 0),
+                frame_data.get('height', 0),
+                frame_data.get('has_face', False),
+                frame_data.get('no_face_duration', 0.0)
+            )
             
             # Enviar via WebSocket (não bloqueante)
-            message_json = json.dumps(message)
-            self.ws.send(message_json)
+            self.ws.send(
+                b''.join((header, registration, name, detections, image)),
+                opcode=websocket.ABNF.OPCODE_BINARY
+            )
             return True
             
         except Exception as e:
@@ -24,6 +24,7 @@ SERVER_URL = os.getenv('MONITOR_SERVER_URL', 'http://localhost:8000')
 
 # Endpoints
 REPORT_ENDPOINT = f"{SERVER_URL}/api/report/"
+REPORT_BULK_ENDPOINT = f"{SERVER_URL}/api/report/bulk/"
 ALERT_ENDPOINT = f"{SERVER_URL}/api/alert/"
 HEARTBEAT_ENDPOINT = f"{SERVER_URL}/api/heartbeat/"
 
@@ -64,6 +65,8 @@ def clear_student_registration():
 # Configurações de monitoramento
 MONITORING_INTERVAL = 5  # segundos entre cada verificação
 HEARTBEAT_INTERVAL = 10  # segundos entre cada heartbeat (mais frequente para detecção rápida)
+EVENT_FLUSH_INTERVAL = 2  # segundos acumulando eventos antes de enviá-los em lote
+EVENT_BUFFER_MAX = 100  # eventos no buffer que forçam um envio antecipado (servidor aceita até 500)
 
 # Navegadores suportados
 SUPPORTED_BROWSERS = {
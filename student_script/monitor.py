@@ -24,7 +24,7 @@ from datetime import datetime
 from typing import List, Dict, Optional
 
 from config import (
-    MONITORING_INTERVAL, HEARTBEAT_INTERVAL,
+    MONITORING_INTERVAL, HEARTBEAT_INTERVAL, EVENT_FLUSH_INTERVAL, EVENT_BUFFER_MAX,
     SUPPORTED_BROWSERS, MONITORED_PROCESSES,
     LOG_FILE, LOG_LEVEL,
     get_student_info, get_student_registration, save_student_info
@@ -164,6 +164,11 @@ class StudentMonitor:
         self.monitored_titles = set()  # Para evitar reportar títulos repetidos
         self.reported_key_events = set()  # Para evitar reportar teclas múltiplas vezes rapidamente
         
+        # Eventos aguardando envio em lote: pares (event_data, on_result)
+        self.event_buffer = []
+        self.event_buffer_lock = threading.Lock()
+        self.event_flush_wakeup = threading.Event()  # Buffer cheio: enviar antes do intervalo
+        
         # Webcam monitor
         if getattr(sys, 'frozen', False):
             model_path = Path(sys._MEIPASS) / 'face_detection_model' / 'yolov8m_200e.pt'
@@ -257,11 +262,13 @@ class StudentMonitor:
         browser_thread = threading.Thread(target=self._browser_loop, daemon=True)
         heartbeat_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
         cleanup_thread = threading.Thread(target=self._cleanup_loop, daemon=True)
+        event_flush_thread = threading.Thread(target=self._event_flush_loop, daemon=True)
         
         monitor_thread.start()
         browser_thread.start()
         heartbeat_thread.start()
         cleanup_thread.start()
+        event_flush_thread.start()
         
         logger.info("Monitoramento ativo. Pressione Ctrl+C para parar.")
         
@@ -275,6 +282,8 @@ class StudentMonitor:
             self.webcam_monitor.stop()
             self.screen_monitor.stop()
             self.brightspace_detector.stop()
+            # Enviar os eventos que ainda estão no buffer
+            self._flush_events()
             self.api_client.disconnect_webcam_stream()
             self.api_client.disconnect_screen_stream()
             self.api_client.disconnect_browser_stream()
@@ -363,6 +372,58 @@ class StudentMonitor:
                 logger.error(f"Erro ao enviar heartbeat: {e}")
                 time.sleep(HEARTBEAT_INTERVAL)
     
+    def _queue_event(self, event_data: dict, on_result=None):
+        """
+        Coloca um evento no buffer para ser enviado no próximo lote.
+        
+        Args:
+            event_data: Dicionário com dados do evento
+            on_result: Função chamada com True/False quando o envio terminar (para logs)
+        """
+        with self.event_buffer_lock:
+            self.event_buffer.append((event_data, on_result))
+            full = len(self.event_buffer) >= EVENT_BUFFER_MAX
+        
+        if full:
+            self.event_flush_wakeup.set()
+    
+    def _event_flush_loop(self):
+        """Loop que envia os eventos do buffer a cada EVENT_FLUSH_INTERVAL segundos."""
+        while self.running:
+            try:
+                self.event_flush_wakeup.wait(EVENT_FLUSH_INTERVAL)
+                self.event_flush_wakeup.clear()
+                self._flush_events()
+            except Exception as e:
+                logger.error(f"Erro no loop de envio de eventos: {e}", exc_info=True)
+    
+    def _flush_events(self):
+        """
+        Envia os eventos do buffer em lotes (/api/report/bulk/).
+        Se um lote falhar, seus eventos são reenviados um a um.
+        """
+        with self.event_buffer_lock:
+            pending = self.event_buffer
+            self.event_buffer = []
+        
+        for start in range(0, len(pending), EVENT_BUFFER_MAX):
+            batch = pending[start:start + EVENT_BUFFER_MAX]
+            events = [event_data for event_data, _ in batch]
+            
+            if self.api_client.report_events(events):
+                results = [True] * len(batch)
+            else:
+                logger.warning(f"Falha ao reportar lote de {len(batch)} eventos, enviando individualmente")
+                results = [self.api_client.report_event(event_data) for event_data in events]
+            
+            for (_, on_result), success in zip(batch, results):
+                if on_result is None:
+                    continue
+                try:
+                    on_result(success)
+                except Exception as e:
+                    logger.error(f"Erro ao registrar resultado do evento: {e}")
+    
     def _check_browsers_full(self):
         """Verifica URLs acessadas nos navegadores (Scan completo)."""
         # Este método continua existindo para capturar URLs em background ou abas inativas
@@ -508,14 +569,15 @@ class StudentMonitor:
                     event_data['additional_data']['blocked_domain'] = blocked_domain
                     event_data['additional_data']['severity'] = 'high'
             
-            success = self.api_client.report_event(event_data)
+            def log_result(success):
+                if success:
+                    tipo = "URL" if is_valid_url else "Titulo"
+                    blocked_msg = " [BLOQUEADA]" if is_blocked else ""
+                    logger.warning(f"{tipo} reportado{blocked_msg}: {url} ({browser})") if is_blocked else logger.info(f"{tipo} reportado: {url} ({browser})")
+                else:
+                    logger.warning(f"Falha ao reportar: {url}")
             
-            if success:
-                tipo = "URL" if is_valid_url else "Titulo"
-                blocked_msg = " [BLOQUEADA]" if is_blocked else ""
-                logger.warning(f"{tipo} reportado{blocked_msg}: {url} ({browser})") if is_blocked else logger.info(f"{tipo} reportado: {url} ({browser})")
-            else:
-                logger.warning(f"Falha ao reportar: {url}")
+            self._queue_event(event_data, log_result)
                 
         except Exception as e:
             logger.error(f"Erro ao reportar: {e}")
@@ -533,12 +595,13 @@ class StudentMonitor:
                 }
             }
             
-            success = self.api_client.report_event(event_data)
+            def log_result(success):
+                if success:
+                    logger.info(f"Aplicativo reportado: {app_name}")
+                else:
+                    logger.warning(f"Falha ao reportar aplicativo: {app_name}")
             
-            if success:
-                logger.info(f"Aplicativo reportado: {app_name}")
-            else:
-                logger.warning(f"Falha ao reportar aplicativo: {app_name}")
+            self._queue_event(event_data, log_result)
                 
         except Exception as e:
             logger.error(f"Erro ao reportar aplicativo: {e}")
@@ -570,13 +633,14 @@ class StudentMonitor:
                 'additional_data': event_data
             }
             
-            # Enviar para o servidor
-            success = self.api_client.report_event(report_data)
+            def log_result(success):
+                if success:
+                    logger.warning(f"ALERTA: Tecla especial detectada: {event_data.get('description', event_name)}")
+                else:
+                    logger.warning(f"Falha ao reportar evento de teclado: {event_name}")
             
-            if success:
-                logger.warning(f"ALERTA: Tecla especial detectada: {event_data.get('description', event_name)}")
-            else:
-                logger.warning(f"Falha ao reportar evento de teclado: {event_name}")
+            # Enviar para o servidor (no próximo lote)
+            self._queue_event(report_data, log_result)
         
         except Exception as e:
             logger.error(f"Erro ao processar evento de teclado: {e}", exc_info=True)
@@ -693,9 +757,6 @@ class StudentMonitor:
                     event_data['additional_data']['blocked_domain'] = blocked_domain
                     event_data['additional_data']['severity'] = 'critical'  # Elevar severidade
             
-            # Enviar para o servidor (histórico)
-            success = self.api_client.report_event(event_data)
-            
             # 🆕 ENVIAR ALERTA se for de alta prioridade (slides ou acesso indevido)
             if page_type == 'slides' or alert_type == 'unauthorized_access_during_quiz':
                 # Definir severidade do alerta
@@ -734,62 +795,66 @@ class StudentMonitor:
                 })
             
             # 🆕 Logs melhorados baseados no tipo e severidade
-            if success:
-                if alert_type == 'page_view':
-                    # Visualização normal
-                    if page_type == 'slides':
-                        logger.error("=" * 80)
-                        logger.error("⚠️  [ALERTA DE ALTA PRIORIDADE] SLIDES/CONTEÚDO DETECTADO!")
-                        logger.error("=" * 80)
-                        logger.error(f"   Aluno está visualizando MATERIAL/CONTEÚDO do Brightspace")
-                        logger.error(f"   URL: {url}")
-                        logger.error(f"   Status: {'🔴 EM PROVA - POSSÍVEL VIOLAÇÃO!' if alert_data.get('is_in_quiz') else '🟡 Navegação Normal'}")
-                        logger.error(f"   Severidade: HIGH")
-                        logger.error("   ✅ Evento enviado para o backend com sucesso")
-                        logger.error("=" * 80)
-                    elif page_type == 'quiz':
-                        logger.info(f"📝 AVA: Aluno acessou página de prova")
-                        logger.info(f"   URL: {url}")
-                    else:
-                        logger.info(f"🌐 AVA: Aluno navegando no Brightspace")
-                        logger.debug(f"   URL: {url}")
+            def log_result(success):
+                if success:
+                    if alert_type == 'page_view':
+                        # Visualização normal
+                        if page_type == 'slides':
+                            logger.error("=" * 80)
+                            logger.error("⚠️  [ALERTA DE ALTA PRIORIDADE] SLIDES/CONTEÚDO DETECTADO!")
+                            logger.error("=" * 80)
+                            logger.error(f"   Aluno está visualizando MATERIAL/CONTEÚDO do Brightspace")
+                            logger.error(f"   URL: {url}")
+                            logger.error(f"   Status: {'🔴 EM PROVA - POSSÍVEL VIOLAÇÃO!' if alert_data.get('is_in_quiz') else '🟡 Navegação Normal'}")
+                            logger.error(f"   Severidade: HIGH")
+                            logger.error("   ✅ Evento enviado para o backend com sucesso")
+                            logger.error("=" * 80)
+                        elif page_type == 'quiz':
+                            logger.info(f"📝 AVA: Aluno acessou página de prova")
+                            logger.info(f"   URL: {url}")
+                        else:
+                            logger.info(f"🌐 AVA: Aluno navegando no Brightspace")
+                            logger.debug(f"   URL: {url}")
                 
-                elif alert_type == 'unauthorized_access_during_quiz':
-                    # Acesso indevido - CRÍTICO
-                    logger.error("=" * 80)
-                    logger.error(f"[ALERTA CRITICO] ACESSO INDEVIDO DURANTE PROVA!")
-                    logger.error(f"   Mensagem: {message}")
-                    logger.error(f"   URL acessada: {url}")
-                    logger.error(f"   Tipo: {alert_data.get('access_type', 'desconhecido')}")
+                    elif alert_type == 'unauthorized_access_during_quiz':
+                        # Acesso indevido - CRÍTICO
+                        logger.error("=" * 80)
+                        logger.error(f"[ALERTA CRITICO] ACESSO INDEVIDO DURANTE PROVA!")
+                        logger.error(f"   Mensagem: {message}")
+                        logger.error(f"   URL acessada: {url}")
+                        logger.error(f"   Tipo: {alert_data.get('access_type', 'desconhecido')}")
                     
-                    # Verificar se também é URL bloqueada
-                    is_blocked, blocked_domain = self.browser_monitor.is_url_blocked(url)
-                    if is_blocked:
-                        logger.error(f"   [ATENCAO] Esta URL tambem esta na lista de bloqueios!")
-                        logger.error(f"   Dominio bloqueado: {blocked_domain}")
+                        # Verificar se também é URL bloqueada
+                        is_blocked, blocked_domain = self.browser_monitor.is_url_blocked(url)
+                        if is_blocked:
+                            logger.error(f"   [ATENCAO] Esta URL tambem esta na lista de bloqueios!")
+                            logger.error(f"   Dominio bloqueado: {blocked_domain}")
                     
-                    logger.error("=" * 80)
+                        logger.error("=" * 80)
                 
-                elif alert_type == 'quiz_started':
-                    logger.warning("=" * 60)
-                    logger.warning(f"[PROVA] PROVA INICIADA no Brightspace")
-                    logger.warning(f"   URL: {url}")
-                    logger.warning(f"   Monitoramento critico ATIVADO")
-                    logger.warning("=" * 60)
+                    elif alert_type == 'quiz_started':
+                        logger.warning("=" * 60)
+                        logger.warning(f"[PROVA] PROVA INICIADA no Brightspace")
+                        logger.warning(f"   URL: {url}")
+                        logger.warning(f"   Monitoramento critico ATIVADO")
+                        logger.warning("=" * 60)
                 
-                elif alert_type == 'quiz_ended':
-                    duration = alert_data.get('quiz_duration', 0)
-                    logger.info("=" * 60)
-                    logger.info(f"[PROVA] PROVA FINALIZADA no Brightspace")
-                    if duration:
-                        logger.info(f"   Duracao: {duration:.0f} segundos ({duration/60:.1f} minutos)")
-                    logger.info(f"   Monitoramento critico DESATIVADO")
-                    logger.info("=" * 60)
+                    elif alert_type == 'quiz_ended':
+                        duration = alert_data.get('quiz_duration', 0)
+                        logger.info("=" * 60)
+                        logger.info(f"[PROVA] PROVA FINALIZADA no Brightspace")
+                        if duration:
+                            logger.info(f"   Duracao: {duration:.0f} segundos ({duration/60:.1f} minutos)")
+                        logger.info(f"   Monitoramento critico DESATIVADO")
+                        logger.info("=" * 60)
                 
+                    else:
+                        logger.info(f"ℹ️  Evento Brightspace: {alert_type}")
                 else:
-                    logger.info(f"ℹ️  Evento Brightspace: {alert_type}")
-            else:
-                logger.warning(f"⚠️  Falha ao reportar evento Brightspace: {alert_type}")
+                    logger.warning(f"⚠️  Falha ao reportar evento Brightspace: {alert_type}")
+            
+            # Enviar para o servidor (histórico, no próximo lote)
+            self._queue_event(event_data, log_result)
         
         except Exception as e:
             logger.error(f"Erro ao processar alerta do Brightspace: {e}", exc_info=True)
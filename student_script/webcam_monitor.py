@@ -7,7 +7,6 @@ import cv2
 import logging
 import threading
 import time
-import base64
 import numpy as np
 from pathlib import Path
 from typing import Optional, Callable
@@ -293,12 +292,12 @@ class WebcamMonitor:
                 ]
                 _, buffer = cv2.imencode('.jpg', annotated_frame, encode_param)
                 
-                # Converter para base64
-                frame_base64 = base64.b64encode(buffer).decode('utf-8')
+                # Bytes JPEG crus (enviados em frame binário, sem base64)
+                frame_bytes = buffer.tobytes()
                 
                 # Preparar dados para envio
                 frame_data = {
-                    'frame': frame_base64,
+                    'frame': frame_bytes,
                     'detections': detections,
                     'timestamp': current_time,
                     'frame_number': self.frames_captured,
@@ -313,7 +312,7 @@ class WebcamMonitor:
                     try:
                         self.frame_callback(frame_data)
                         self.frames_sent += 1
-                        self.total_bytes_sent += len(frame_base64)
+                        self.total_bytes_sent += len(frame_bytes)
                     except Exception as e:
                         logger.error(f"Erro ao enviar frame via callback: {e}")
                 